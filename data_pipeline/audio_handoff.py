@@ -0,0 +1,127 @@
+# ======================================================
+# IN-PROCESS AUDIO HANDOFF (PHASE A → PHASE B)
+# ======================================================
+# model.transcribe(path) launches ffmpeg per file to decode and
+# resample audio that Phase A already wrote as mono WAV at its
+# target_sample_rate. Here Whisper gets float32 arrays instead:
+# - samples handed over by Phase A in the same process, or
+# - the Phase A WAV read in-process (soundfile, no resample)
+# A WAV not at the Whisper rate falls back to the path (ffmpeg).
+#
+# PCM_16 WAVs read as x / 32768, the same values ffmpeg's s16le
+# output gives whisper.load_audio.
+# ======================================================
+
+import os
+import time
+
+import numpy as np
+
+# --------------------------------------------------
+# PATHS / PARAMETERS
+# --------------------------------------------------
+
+PHASE_A_CONFIG = r"D:\new_p_voice_ai_v3\data_pipeline\configs\audio_preprocess_config.yaml"
+
+# whisper.audio.SAMPLE_RATE
+WHISPER_SAMPLE_RATE = 16000
+
+# False = always hand the path to Whisper (ffmpeg)
+IN_PROCESS_AUDIO = True
+
+_PHASE_A_RATE = None
+
+
+def phase_A_sample_rate():
+    """
+    Phase A target_sample_rate (None if its config is not readable).
+    """
+    global _PHASE_A_RATE
+
+    if _PHASE_A_RATE is None:
+        import yaml
+
+        try:
+            with open(PHASE_A_CONFIG, "r") as f:
+                _PHASE_A_RATE = yaml.safe_load(f)["target_sample_rate"]
+        except OSError:
+            return None
+
+    return _PHASE_A_RATE
+
+
+def load_audio_array(audio_path):
+    """
+    float32 mono samples of a Phase A WAV, read in-process;
+    None when it would need a resample / downmix.
+    """
+    import soundfile as sf
+
+    rate = phase_A_sample_rate()
+    if rate is not None and rate != WHISPER_SAMPLE_RATE:
+        return None
+
+    samples, sr = sf.read(audio_path, dtype="float32", always_2d=False)
+
+    if sr != WHISPER_SAMPLE_RATE or samples.ndim != 1:
+        return None
+
+    return samples
+
+
+def audio_input(audio_path, samples=None):
+    """
+    What Whisper receives for audio_path: handed-over samples,
+    in-process WAV samples, else the path itself.
+    """
+    if samples is not None:
+        return np.asarray(samples, dtype=np.float32)
+
+    if IN_PROCESS_AUDIO:
+        loaded = load_audio_array(audio_path)
+        if loaded is not None:
+            return loaded
+
+    return audio_path
+
+
+def benchmark_audio_handoff(audio_paths):
+    """
+    Per-file decode time: ffmpeg (whisper.load_audio) vs in-process.
+    Returns [(file_name, ffmpeg_sec, in_process_sec, saved_sec)].
+    """
+    from whisper.audio import load_audio
+
+    report = []
+
+    for audio_path in audio_paths:
+        started = time.perf_counter()
+        reference = load_audio(audio_path)
+        ffmpeg_sec = time.perf_counter() - started
+
+        started = time.perf_counter()
+        samples = load_audio_array(audio_path)
+        in_process_sec = time.perf_counter() - started
+
+        if samples is None:
+            print(f"{os.path.basename(audio_path)}: not a {WHISPER_SAMPLE_RATE} Hz mono WAV, skipped")
+            continue
+
+        if not np.array_equal(samples, reference):
+            print(f"⚠ {os.path.basename(audio_path)}: in-process samples differ from ffmpeg")
+
+        saved = ffmpeg_sec - in_process_sec
+        report.append((os.path.basename(audio_path), ffmpeg_sec, in_process_sec, saved))
+
+        print(
+            f"{os.path.basename(audio_path)}: ffmpeg {ffmpeg_sec * 1000:.1f} ms, "
+            f"in-process {in_process_sec * 1000:.1f} ms, saved {saved * 1000:.1f} ms"
+        )
+
+    if report:
+        print(
+            f"Audio handoff: {len(report)} files, mean saved "
+            f"{np.mean([r[3] for r in report]) * 1000:.1f} ms per file"
+        )
+
+    return report
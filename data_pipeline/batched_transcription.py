@@ -0,0 +1,420 @@
+# ======================================================
+# PHASE B — BATCHED MULTI-FILE WHISPER DECODING
+# ======================================================
+# model.transcribe() runs the encoder with batch size 1.
+# Orders are mostly < 30 s (one Whisper window), so here
+# the windows of N files are stacked into ONE encoder /
+# decoder batch.
+#
+# The per-file seek loop of whisper.transcribe is kept:
+# - language detected per file on its first 30 s (batched)
+# - every round decodes the next window of every unfinished
+#   file; windows sharing (language, prompt) share a batch
+#   (all first windows; continuations carry their own prompt)
+# - temperature fallback only for the items that need it
+# - segments / seek / no-speech skip as in transcribe()
+#
+# The encoder runs here (once per window, reused by every fallback
+# temperature); feature_cache (data_pipeline.feature_cache) persists
+# the log-mel and encoder outputs so decode-only reruns skip both.
+#
+# options: the model.transcribe() keyword arguments of a decode
+# profile (data_pipeline.decode_profiles), applied the same way.
+# watchdog=True decodes under data_pipeline.decode_watchdog
+# (token budget from each window's own audio length).
+#
+# Returns per-file dicts shaped like model.transcribe()
+# ({"text", "segments", "language"}) plus the audio
+# "duration" (seconds) for throughput reporting and the
+# "watchdog_cutoffs" count.
+# ======================================================
+
+from typing import List
+
+import numpy as np
+import torch
+from whisper.audio import (
+    HOP_LENGTH,
+    N_FRAMES,
+    N_SAMPLES,
+    SAMPLE_RATE,
+    log_mel_spectrogram,
+    pad_or_trim,
+)
+from whisper.decoding import DecodingOptions
+from data_pipeline.feature_cache import audio_hash
+from data_pipeline.decode_watchdog import max_tokens, watchdog_decode
+from whisper.tokenizer import get_tokenizer
+from whisper.utils import exact_div
+
+# ------------------------------------------------------
+# PARAMETERS (transcribe() defaults)
+# ------------------------------------------------------
+
+DEFAULT_BATCH_SIZE = 8
+
+TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+
+class _FileState:
+    """
+    Seek-loop state of one audio file.
+    """
+
+    __slots__ = (
+        "audio_path", "audio_hash", "mel", "content_frames", "seek", "watchdog_cutoffs",
+        "language", "tokenizer", "all_tokens", "prompt_reset_since",
+        "segments",
+    )
+
+    def __init__(self, audio_path, mel, content_hash=None):
+        self.audio_path = audio_path
+        self.audio_hash = content_hash
+        self.mel = mel
+        self.watchdog_cutoffs = 0
+        self.content_frames = mel.shape[-1] - N_FRAMES
+        self.seek = 0
+        self.language = None
+        self.tokenizer = None
+        self.all_tokens = []
+        self.prompt_reset_since = 0
+        self.segments = []
+
+    @property
+    def prompt(self):
+        return tuple(self.all_tokens[self.prompt_reset_since:])
+
+    def mel_window(self, start, size):
+        window = self.mel[:, start:start + size]
+        if isinstance(window, np.ndarray):
+            # memory-mapped cache entry
+            window = torch.from_numpy(np.array(window))
+        return window
+
+
+def _load_mel(model, audio, feature_cache):
+    if feature_cache is None:
+        return log_mel_spectrogram(audio, model.dims.n_mels, padding=N_SAMPLES), None
+
+    content_hash = audio_hash(audio)
+
+    mel = feature_cache.get("mel", content_hash)
+    if mel is None:
+        mel = log_mel_spectrogram(audio, model.dims.n_mels, padding=N_SAMPLES)
+        feature_cache.put("mel", content_hash, mel.cpu().numpy())
+
+    return mel, content_hash
+
+
+def _encode(model, states, mel_windows, dtype, feature_cache, kind, seeks):
+    """
+    Encoder outputs (batch, n_audio_ctx, n_audio_state) of the windows;
+    cached windows are not re-encoded.
+    """
+    features = [None] * len(states)
+
+    if feature_cache is not None:
+        for i, (s, seek) in enumerate(zip(states, seeks)):
+            cached = feature_cache.get(kind, s.audio_hash, seek)
+            if cached is not None:
+                features[i] = torch.from_numpy(np.array(cached))
+
+    missing = [i for i, f in enumerate(features) if f is None]
+
+    if missing:
+        mel_batch = torch.stack(
+            [mel_windows[i] for i in missing]
+        ).to(model.device).to(dtype)
+
+        with torch.no_grad():
+            encoded = model.encoder(mel_batch)
+
+        for i, f in zip(missing, encoded):
+            features[i] = f
+            if feature_cache is not None:
+                feature_cache.put(kind, states[i].audio_hash, f.cpu().numpy(), seeks[i])
+
+    return torch.stack(features).to(model.device).to(dtype)
+
+
+def _detect_languages(model, states, dtype, feature_cache=None):
+    if not model.is_multilingual:
+        for s in states:
+            s.language = "en"
+        return
+
+    features = _encode(
+        model,
+        states,
+        [pad_or_trim(s.mel_window(0, N_FRAMES), N_FRAMES) for s in states],
+        dtype,
+        feature_cache,
+        "lang",
+        [None] * len(states)
+    )
+
+    # Encoder output in → detect_language skips the encoder
+    _, probs = model.detect_language(features)
+
+    for s, file_probs in zip(states, probs):
+        s.language = max(file_probs, key=file_probs.get)
+
+
+def _decode_with_fallback(model, features, language, prompt, fp16, options,
+                          token_budgets=None):
+    """
+    decode_with_fallback of transcribe(), per batch item.
+    features: encoder outputs (decode skips the encoder).
+    token_budgets: per-item watchdog budgets (None = no watchdog).
+    Returns (results, cut-off count per item).
+    """
+    cutoffs = [0] * features.shape[0]
+    results = [None] * features.shape[0]
+    todo = list(range(features.shape[0]))
+
+    temperatures = options.get("temperature", TEMPERATURES)
+    if isinstance(temperatures, (int, float)):
+        temperatures = (temperatures,)
+
+    for temperature in temperatures:
+        # beam search at t=0, best_of sampling at t>0 (as transcribe())
+        search = (
+            {"best_of": options.get("best_of")} if temperature > 0
+            else {"beam_size": options.get("beam_size")}
+        )
+
+        decoding = DecodingOptions(
+            task="transcribe",
+            language=language,
+            prompt=list(prompt),
+            temperature=temperature,
+            without_timestamps=options.get("without_timestamps", False),
+            fp16=fp16,
+            **search
+        )
+
+        if token_budgets is None:
+            decoded = model.decode(features[todo], decoding)
+        else:
+            decoded, reasons = watchdog_decode(
+                model, features[todo], decoding, [token_budgets[i] for i in todo]
+            )
+            for i, reason in zip(todo, reasons):
+                cutoffs[i] += reason is not None
+
+        retry = []
+        for i, result in zip(todo, decoded):
+            results[i] = result
+
+            needs_fallback = (
+                result.compression_ratio > COMPRESSION_RATIO_THRESHOLD
+                or result.avg_logprob < LOGPROB_THRESHOLD
+            )
+            if result.no_speech_prob > NO_SPEECH_THRESHOLD:
+                needs_fallback = False
+
+            if needs_fallback:
+                retry.append(i)
+
+        todo = retry
+        if not todo:
+            break
+
+    return results, cutoffs
+
+
+def _consume_window(s: _FileState, segment_size: int, result, time_precision: float,
+                    condition_on_previous_text: bool = True):
+    """
+    Segments + seek update of one decoded window (transcribe() loop body).
+    """
+    tokenizer = s.tokenizer
+    time_offset = float(s.seek * HOP_LENGTH / SAMPLE_RATE)
+    segment_duration = segment_size * HOP_LENGTH / SAMPLE_RATE
+    input_stride = round(time_precision * SAMPLE_RATE / HOP_LENGTH)
+
+    should_skip = result.no_speech_prob > NO_SPEECH_THRESHOLD
+    if result.avg_logprob > LOGPROB_THRESHOLD:
+        should_skip = False
+
+    if should_skip:
+        s.seek += segment_size
+        return
+
+    seek = s.seek
+    tokens = torch.tensor(result.tokens)
+
+    def new_segment(start, end, segment_tokens):
+        segment_tokens = segment_tokens.tolist()
+        text_tokens = [t for t in segment_tokens if t < tokenizer.eot]
+        return {
+            "seek": seek,
+            "start": start,
+            "end": end,
+            "text": tokenizer.decode(text_tokens),
+            "tokens": segment_tokens,
+            "temperature": result.temperature,
+            "avg_logprob": result.avg_logprob,
+            "compression_ratio": result.compression_ratio,
+            "no_speech_prob": result.no_speech_prob,
+        }
+
+    current_segments = []
+
+    timestamp_tokens = tokens.ge(tokenizer.timestamp_begin)
+    single_timestamp_ending = timestamp_tokens[-2:].tolist() == [False, True]
+
+    consecutive = torch.where(timestamp_tokens[:-1] & timestamp_tokens[1:])[0]
+    consecutive.add_(1)
+
+    if len(consecutive) > 0:
+        slices = consecutive.tolist()
+        if single_timestamp_ending:
+            slices.append(len(tokens))
+
+        last_slice = 0
+        for current_slice in slices:
+            sliced_tokens = tokens[last_slice:current_slice]
+            start_pos = sliced_tokens[0].item() - tokenizer.timestamp_begin
+            end_pos = sliced_tokens[-1].item() - tokenizer.timestamp_begin
+            current_segments.append(new_segment(
+                time_offset + start_pos * time_precision,
+                time_offset + end_pos * time_precision,
+                sliced_tokens
+            ))
+            last_slice = current_slice
+
+        if single_timestamp_ending:
+            s.seek += segment_size
+        else:
+            last_timestamp_pos = (
+                tokens[last_slice - 1].item() - tokenizer.timestamp_begin
+            )
+            s.seek += last_timestamp_pos * input_stride
+    else:
+        duration = segment_duration
+        timestamps = tokens[timestamp_tokens.nonzero().flatten()]
+        if len(timestamps) > 0 and timestamps[-1].item() != tokenizer.timestamp_begin:
+            last_timestamp_pos = timestamps[-1].item() - tokenizer.timestamp_begin
+            duration = last_timestamp_pos * time_precision
+
+        current_segments.append(new_segment(
+            time_offset, time_offset + duration, tokens
+        ))
+        s.seek += segment_size
+
+    # Instantaneous or empty segments are cleared
+    for segment in current_segments:
+        if segment["start"] == segment["end"] or segment["text"].strip() == "":
+            segment["text"] = ""
+            segment["tokens"] = []
+
+    s.segments.extend(
+        {"id": i, **segment}
+        for i, segment in enumerate(current_segments, start=len(s.segments))
+    )
+    s.all_tokens.extend(
+        token for segment in current_segments for token in segment["tokens"]
+    )
+
+    # condition_on_previous_text, reset after a high-temperature window
+    if not condition_on_previous_text or result.temperature > 0.5:
+        s.prompt_reset_since = len(s.all_tokens)
+
+
+def transcribe_batch(model, audio_paths: List, feature_cache=None,
+                     options=None, watchdog=False) -> List[dict]:
+    """
+    Transcribes all audio_paths as one batch (see module header).
+    Items are paths or float32 arrays at 16 kHz (audio_handoff).
+    feature_cache: FeatureCache of this model / quantization, or None.
+    options: decode profile options (decode_profiles.decode_options).
+    watchdog: cut off runaway decodes (data_pipeline.decode_watchdog).
+    """
+    options = options or {}
+    condition = options.get("condition_on_previous_text", True)
+
+    fp16 = model.device != torch.device("cpu")
+    dtype = torch.float16 if fp16 else torch.float32
+
+    input_stride = exact_div(N_FRAMES, model.dims.n_audio_ctx)
+    time_precision = input_stride * HOP_LENGTH / SAMPLE_RATE
+
+    states = [
+        _FileState(path, *_load_mel(model, path, feature_cache))
+        for path in audio_paths
+    ]
+
+    if not states:
+        return []
+
+    if options.get("language") is not None:
+        # Pinned by the decode profile
+        for s in states:
+            s.language = options["language"]
+    else:
+        _detect_languages(model, states, dtype, feature_cache)
+
+    for s in states:
+        s.tokenizer = get_tokenizer(
+            model.is_multilingual,
+            num_languages=model.num_languages,
+            language=s.language,
+            task="transcribe"
+        )
+
+    while True:
+        pending = [s for s in states if s.seek < s.content_frames]
+        if not pending:
+            break
+
+        groups = {}
+        for s in pending:
+            groups.setdefault((s.language, s.prompt), []).append(s)
+
+        for (language, prompt), group in groups.items():
+            segment_sizes = [
+                min(N_FRAMES, s.content_frames - s.seek) for s in group
+            ]
+
+            features = _encode(
+                model,
+                group,
+                [
+                    pad_or_trim(s.mel_window(s.seek, size), N_FRAMES)
+                    for s, size in zip(group, segment_sizes)
+                ],
+                dtype,
+                feature_cache,
+                "enc",
+                # window = (seek, size): a shorter tail is a different input
+                [f"{s.seek}+{size}" for s, size in zip(group, segment_sizes)]
+            )
+
+            token_budgets = None
+            if watchdog:
+                token_budgets = [
+                    max_tokens(size * HOP_LENGTH / SAMPLE_RATE) for size in segment_sizes
+                ]
+
+            results, cutoffs = _decode_with_fallback(
+                model, features, language, prompt, fp16, options, token_budgets
+            )
+
+            for s, size, result, cut in zip(group, segment_sizes, results, cutoffs):
+                s.watchdog_cutoffs += cut
+                _consume_window(s, size, result, time_precision, condition)
+
+    return [
+        {
+            "text": s.tokenizer.decode(s.all_tokens),
+            "segments": s.segments,
+            "language": s.language,
+            "duration": s.content_frames * HOP_LENGTH / SAMPLE_RATE,
+            "watchdog_cutoffs": s.watchdog_cutoffs,
+        }
+        for s in states
+    ]
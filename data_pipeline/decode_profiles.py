@@ -0,0 +1,66 @@
+# ======================================================
+# PHASE B — DECODE PROFILES (LATENCY BUDGETS)
+# ======================================================
+# model.transcribe() defaults detect the language per file,
+# retry up to 6 temperatures and condition every window on
+# the previous text; each multiplies decode time.
+# A profile fixes these per run:
+#
+# - language                    : pinned (None = detect per file)
+# - beam_size / best_of         : beam at t=0 / samples at t>0
+# - temperature                 : fallback policy
+# - condition_on_previous_text
+# - without_timestamps          : one segment per 30 s window
+#
+# The profile name is stored with every segment (decode_profile).
+# ======================================================
+
+# Orders are Indian-English (see phase_D phonetic_index)
+PINNED_LANGUAGE = "en"
+
+DECODE_PROFILES = {
+    # transcribe() fallback ladder, beam search at t=0
+    "accurate": {
+        "language": None,
+        "beam_size": 5,
+        "best_of": 5,
+        "temperature": (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        "condition_on_previous_text": True,
+        "without_timestamps": False,
+    },
+    # pinned language, greedy, short fallback ladder
+    "balanced": {
+        "language": PINNED_LANGUAGE,
+        "beam_size": None,
+        "best_of": 3,
+        "temperature": (0.0, 0.4, 0.8),
+        "condition_on_previous_text": False,
+        "without_timestamps": False,
+    },
+    # single greedy pass, window-level timestamps
+    "fast": {
+        "language": PINNED_LANGUAGE,
+        "beam_size": None,
+        "best_of": None,
+        "temperature": (0.0,),
+        "condition_on_previous_text": False,
+        "without_timestamps": True,
+    },
+}
+
+
+def decode_options(decode_profile=None) -> dict:
+    """
+    model.transcribe() keyword arguments of a profile
+    (None = Whisper defaults, as before profiles existed).
+    """
+    if decode_profile is None:
+        return {}
+
+    if decode_profile not in DECODE_PROFILES:
+        raise ValueError(
+            f"Unknown decode profile {decode_profile!r} "
+            f"(expected one of {', '.join(DECODE_PROFILES)})"
+        )
+
+    return dict(DECODE_PROFILES[decode_profile])
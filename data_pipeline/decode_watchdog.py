@@ -0,0 +1,215 @@
+# ======================================================
+# PHASE B — RUNAWAY DECODE WATCHDOG
+# ======================================================
+# On noisy / near-silent orders Whisper can loop on the same
+# tokens up to sample_len (224) before the compression-ratio
+# check triggers a re-decode at the next temperature; one
+# bad file then takes many times real time.
+#
+# A logit filter checks every decoding step (tail only):
+# - repetition : the last tokens repeat a period of <= 12
+#                tokens >= 3 times (>= 12 tokens in total)
+# - token_rate : more text tokens than WATCHDOG_MAX_TOKENS_PER_SEC
+#                of window audio allow
+# and forces <|endoftext|> on that sequence. The cut-off result
+# goes through the usual fallback checks (earlier), so the
+# decode time per attempt is bounded.
+#
+# Segments still showing a runaway are flagged (watchdog column);
+# files with at least one cut-off decode are counted as rescued.
+# ======================================================
+
+import math
+from contextlib import contextmanager
+from dataclasses import replace
+
+import torch
+from whisper.audio import CHUNK_LENGTH, HOP_LENGTH, SAMPLE_RATE
+from whisper.decoding import DecodingOptions, DecodingTask, LogitFilter
+from whisper.tokenizer import get_tokenizer
+
+# --------------------------------------------------
+# PARAMETERS
+# --------------------------------------------------
+
+# Dictated orders run ~3 words/s (~4-5 tokens/s)
+WATCHDOG_MAX_TOKENS_PER_SEC = 8.0
+WATCHDOG_MIN_TOKENS = 32
+
+WATCHDOG_MAX_PERIOD = 12
+WATCHDOG_MIN_REPEATS = 3
+WATCHDOG_MIN_REPEAT_TOKENS = 12
+
+
+def max_tokens(audio_sec: float) -> int:
+    """
+    Text-token budget of audio_sec of window audio.
+    """
+    return max(WATCHDOG_MIN_TOKENS, math.ceil(WATCHDOG_MAX_TOKENS_PER_SEC * audio_sec))
+
+
+def window_budgets(model, mel) -> list:
+    """
+    Token budget of each window model.transcribe() decodes: a window
+    shorter than 30 s (mel[:, seek:seek + segment_size]) reaches decode
+    padded by pad_or_trim with all-zero log-mel frames, which real
+    (clamped, normalised) frames never are.
+    """
+    if mel.shape[-2] != model.dims.n_mels:
+        # encoder features: window length unknown
+        return [max_tokens(CHUNK_LENGTH)] * mel.shape[0]
+
+    budgets = []
+    for has_signal in (mel.abs().amax(dim=-2) != 0):
+        nonzero = has_signal.nonzero()
+        frames = int(nonzero[-1]) + 1 if len(nonzero) else 0
+        budgets.append(max_tokens(frames * HOP_LENGTH / SAMPLE_RATE))
+
+    return budgets
+
+
+def runaway_reason(text_tokens, token_budget: int):
+    """
+    "token_rate" / "repetition" if the tail of text_tokens is runaway, else None.
+    """
+    n = len(text_tokens)
+
+    if n >= token_budget:
+        return "token_rate"
+
+    for period in range(1, WATCHDOG_MAX_PERIOD + 1):
+        span = period * max(
+            WATCHDOG_MIN_REPEATS, math.ceil(WATCHDOG_MIN_REPEAT_TOKENS / period)
+        )
+        if span > n:
+            continue
+
+        tail = text_tokens[n - span:]
+        if all(tail[i] == tail[i + period] for i in range(span - period)):
+            return "repetition"
+
+    return None
+
+
+class _RunawayFilter(LogitFilter):
+    """
+    Forces <|endoftext|> on runaway sequences; reasons[i] = first
+    cut-off reason of audio item i.
+    """
+
+    def __init__(self, tokenizer, sample_begin, n_group, token_budgets):
+        self.eot = tokenizer.eot
+        self.sample_begin = sample_begin
+        self.n_group = n_group
+        self.token_budgets = token_budgets
+        self.reasons = [None] * len(token_budgets)
+
+    def apply(self, logits: torch.Tensor, tokens: torch.Tensor):
+        for row, sequence in enumerate(tokens[:, self.sample_begin:].tolist()):
+            if sequence and sequence[-1] == self.eot:
+                continue
+
+            item = row // self.n_group
+            reason = runaway_reason(
+                [t for t in sequence if t < self.eot], self.token_budgets[item]
+            )
+
+            if reason is not None:
+                logits[row, :] = -math.inf
+                logits[row, self.eot] = 0
+                if self.reasons[item] is None:
+                    self.reasons[item] = reason
+
+
+class _WatchdogTask(DecodingTask):
+
+    def __init__(self, model, options, token_budgets):
+        super().__init__(model, options)
+        self.runaway_filter = _RunawayFilter(
+            self.tokenizer, self.sample_begin, self.n_group, token_budgets
+        )
+        self.logit_filters.append(self.runaway_filter)
+
+
+@torch.no_grad()
+def watchdog_decode(model, mel, options: DecodingOptions, token_budgets):
+    """
+    whisper.decoding.decode with the runaway filter.
+    mel: (n_mels, frames) / (batch, ...) log-mel or encoder features.
+    Returns (results, reasons), results as model.decode returns them.
+    """
+    single = mel.ndim == 2
+    if single:
+        mel = mel.unsqueeze(0)
+
+    if isinstance(token_budgets, int):
+        token_budgets = [token_budgets] * mel.shape[0]
+
+    task = _WatchdogTask(model, options, list(token_budgets))
+    results = task.run(mel)
+
+    if single:
+        return results[0], task.runaway_filter.reasons[0]
+
+    return results, task.runaway_filter.reasons
+
+
+class DecodeWatchdog:
+    """
+    Cut-off counts per file of one work item (returned to the
+    parent process with its rows).
+    """
+
+    def __init__(self):
+        self.cutoffs = {}
+
+    def record(self, key, reason):
+        if reason is not None:
+            self.cutoffs[key] = self.cutoffs.get(key, 0) + 1
+
+    @contextmanager
+    def guard(self, model, key):
+        """
+        model.decode of every model.transcribe() call inside the block
+        (VAD / in-process long-audio chunks included) runs under the
+        watchdog, each window with the budget of its own length.
+        """
+
+        def decode(mel, options=DecodingOptions(), **kwargs):
+            if kwargs:
+                options = replace(options, **kwargs)
+
+            single = mel.ndim == 2
+            batch = mel.unsqueeze(0) if single else mel
+
+            results, reasons = watchdog_decode(
+                model, batch, options, window_budgets(model, batch)
+            )
+
+            for reason in reasons:
+                self.record(key, reason)
+
+            return results[0] if single else results
+
+        model.decode = decode
+        try:
+            yield
+        finally:
+            del model.decode
+
+    @staticmethod
+    def flag_segments(model, result):
+        """
+        seg["watchdog"] = runaway reason of the segment text, else None.
+        """
+        eot = get_tokenizer(
+            model.is_multilingual, num_languages=model.num_languages
+        ).eot
+
+        for seg in result.get("segments", []):
+            text_tokens = [t for t in seg.get("tokens", []) if t < eot]
+            seg["watchdog"] = runaway_reason(
+                text_tokens, max_tokens(seg["end"] - seg["start"])
+            )
+
+        return result
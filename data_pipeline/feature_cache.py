@@ -0,0 +1,200 @@
+# ======================================================
+# PHASE B — WHISPER FEATURE CACHE (LOG-MEL / ENCODER)
+# ======================================================
+# Decode-setting sweeps and model comparisons re-run Phase B
+# on unchanged audio; the log-mel and the encoder pass are
+# most of the CPU time. Persisted here, keyed by
+#   (audio content hash, model name, quantization mode)
+#
+# - mel  : padded log-mel of the file
+# - lang : encoder output of the language-detection window
+# - enc  : encoder output of the decode window at a seek
+#
+# - Arrays stored as .npy, read back memory-mapped
+# - SQLite index (bytes, last use); least recently used
+#   entries evicted beyond FEATURE_CACHE_MAX_BYTES
+# - Connection opened per process (forked Phase B workers)
+# ======================================================
+
+import os
+import time
+import sqlite3
+import hashlib
+
+import numpy as np
+
+# --------------------------------------------------
+# PATHS / PARAMETERS
+# --------------------------------------------------
+
+FEATURE_CACHE_DIR = (
+    r"D:\new_p_voice_ai_v3\data_pipeline\artifacts\whisper_feature_cache"
+)
+
+FEATURE_CACHE_MAX_BYTES = 8 * 1024 ** 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key        TEXT PRIMARY KEY,
+    file       TEXT NOT NULL,
+    bytes      INTEGER NOT NULL,
+    last_used  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_last_used ON entries (last_used);
+"""
+
+
+def audio_hash(audio) -> str:
+    """
+    Content hash of a float32 array, or of the file bytes of a path.
+    """
+    h = hashlib.sha1()
+
+    if isinstance(audio, str):
+        with open(audio, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    else:
+        h.update(np.ascontiguousarray(audio, dtype=np.float32).tobytes())
+
+    return h.hexdigest()
+
+
+class FeatureCache:
+
+    def __init__(self, model_name: str, quantization=None,
+                 cache_dir: str = None, max_bytes: int = None):
+        self.cache_dir = cache_dir or FEATURE_CACHE_DIR
+        self.max_bytes = FEATURE_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.model_key = f"{model_name}:{quantization or 'fp32'}"
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+        self._conn = None
+        self._pid = None
+
+    # --------------------------------------------------
+    # INDEX (one connection per process)
+    # --------------------------------------------------
+
+    @property
+    def conn(self):
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(
+                os.path.join(self.cache_dir, "index.sqlite"), timeout=30
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            self._pid = os.getpid()
+
+        return self._conn
+
+    def _key(self, kind, content_hash, seek=None):
+        return f"{content_hash}:{self.model_key}:{kind}" + (
+            f":{seek}" if seek is not None else ""
+        )
+
+    # --------------------------------------------------
+    # GET / PUT
+    # --------------------------------------------------
+
+    def get(self, kind, content_hash, seek=None):
+        """
+        Memory-mapped array, or None.
+        """
+        key = self._key(kind, content_hash, seek)
+        row = self.conn.execute(
+            "SELECT file FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is not None:
+            path = os.path.join(self.cache_dir, row[0])
+            try:
+                array = np.load(path, mmap_mode="r")
+            except (OSError, ValueError):
+                array = None
+
+            if array is not None:
+                with self.conn:
+                    self.conn.execute(
+                        "UPDATE entries SET last_used = ? WHERE key = ?",
+                        (time.time(), key)
+                    )
+                self.hits += 1
+                return array
+
+            # Index entry without a readable file
+            with self.conn:
+                self.conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+        self.misses += 1
+        return None
+
+    def put(self, kind, content_hash, array, seek=None):
+        key = self._key(kind, content_hash, seek)
+        file = hashlib.sha1(key.encode("utf-8")).hexdigest() + ".npy"
+        path = os.path.join(self.cache_dir, file)
+
+        array = np.ascontiguousarray(array)
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp_path, path)
+
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries (key, file, bytes, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                (key, file, int(array.nbytes), time.time())
+            )
+
+        self._evict()
+
+    def _evict(self):
+        total = self.conn.execute(
+            "SELECT COALESCE(SUM(bytes), 0) FROM entries"
+        ).fetchone()[0]
+
+        if total <= self.max_bytes:
+            return
+
+        for key, file, size in self.conn.execute(
+            "SELECT key, file, bytes FROM entries ORDER BY last_used"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+
+            try:
+                os.remove(os.path.join(self.cache_dir, file))
+            except OSError:
+                pass
+
+            with self.conn:
+                self.conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+            total -= size
+            self.evicted += 1
+
+    def summary(self) -> str:
+        """
+        Hit / miss counts of this process and the cache size.
+        """
+        entries, size = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM entries"
+        ).fetchone()
+
+        return (
+            f"Feature cache ({self.model_key}): {self.hits} hits, "
+            f"{self.misses} misses, {self.evicted} evicted; "
+            f"{entries} entries, {size / 1024 ** 2:.1f} MiB"
+        )
+
+    def close(self):
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+        self._conn = None
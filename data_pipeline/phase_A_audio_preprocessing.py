@@ -23,7 +23,8 @@ import pyloudnorm as pyln
 import numpy as np
 from .utils.audio_utils import remove_dc_offset
 
-def preprocess_audio(input_path: str, output_path: str, config_path: str):
+def preprocess_audio(input_path: str, output_path: str, config_path: str,
+                     return_samples: bool = False):
     # Load config
     with open(config_path, "r") as f:
         cfg = yaml.safe_load(f)
@@ -61,8 +62,15 @@ def preprocess_audio(input_path: str, output_path: str, config_path: str):
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     sf.write(output_path, samples, cfg["target_sample_rate"])
 
-    return {
+    meta = {
         "output_path": output_path,
         "duration_sec": len(samples) / cfg["target_sample_rate"],
         "loudness_target": cfg["loudness_target_lufs"]
     }
+
+    # In-process handoff to Phase B: the samples as written (PCM_16),
+    # float32 at target_sample_rate — identical to reading the WAV back
+    if return_samples:
+        meta["samples"], _ = sf.read(output_path, dtype="float32")
+
+    return meta
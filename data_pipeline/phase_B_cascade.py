@@ -0,0 +1,244 @@
+# ======================================================
+# PHASE B — CONFIDENCE CASCADE (small → large-v1)
+# ======================================================
+# Every file is transcribed by the small tier first.
+# It is escalated to the large tier when
+# - any segment has avg_logprob < CASCADE_MIN_AVG_LOGPROB
+# - any segment with text has no_speech_prob > CASCADE_MAX_NO_SPEECH_PROB
+# - any segment has compression_ratio > CASCADE_MAX_COMPRESSION_RATIO
+# - Phase C finds no item, or any item without a confident boundary
+#
+# Both tiers decode with the run's decode profile (decode_profiles)
+# and, if enabled, under the runaway-decode watchdog.
+# Only the final tier's rows are stored (model_tier column).
+# The report gives the escalation rate and the mean latency saved
+# versus running the large tier on every file (large-tier cost per
+# audio second estimated from the escalated files).
+# ======================================================
+
+import os
+import json
+import time
+from contextlib import nullcontext
+
+import pandas as pd
+
+from data_pipeline.phase_B_transcription import (
+    audio_seconds,
+    segment_rows,
+    new_run_id,
+)
+from data_pipeline.audio_handoff import audio_input, WHISPER_SAMPLE_RATE
+from data_pipeline.decode_profiles import decode_options
+from data_pipeline.phase_C_structured_boundary_extraction.snapshot_loader import (
+    load_medicine_type_snapshot,
+)
+from data_pipeline.phase_C_structured_boundary_extraction.extractor import extract_items
+
+# --------------------------------------------------
+# PATHS
+# --------------------------------------------------
+
+CASCADE_DIR = r"D:\new_p_voice_ai_v3\data_pipeline\artifacts\phase_B_cascade"
+CASCADE_REPORT_JSON = os.path.join(CASCADE_DIR, "phase_B_cascade_report.json")
+CASCADE_DECISIONS_CSV = os.path.join(CASCADE_DIR, "phase_B_cascade_decisions.csv")
+
+# --------------------------------------------------
+# ESCALATION THRESHOLDS
+# --------------------------------------------------
+
+CASCADE_MIN_AVG_LOGPROB = -0.5
+CASCADE_MAX_NO_SPEECH_PROB = 0.6
+CASCADE_MAX_COMPRESSION_RATIO = 2.4
+
+
+def escalation_reasons(result: dict, snapshot: dict) -> list:
+    """
+    Why a small-tier transcript is not trusted ([] = keep it).
+    """
+    reasons = []
+    segments = result.get("segments", [])
+
+    if any(seg["avg_logprob"] < CASCADE_MIN_AVG_LOGPROB for seg in segments):
+        reasons.append("avg_logprob")
+
+    if any(
+        seg["no_speech_prob"] > CASCADE_MAX_NO_SPEECH_PROB and seg["text"].strip()
+        for seg in segments
+    ):
+        reasons.append("no_speech_prob")
+
+    if any(seg["compression_ratio"] > CASCADE_MAX_COMPRESSION_RATIO for seg in segments):
+        reasons.append("compression_ratio")
+
+    # Same aggregation as Phase C
+    transcript = " ".join(
+        seg["text"].strip() for seg in segments if seg["text"].strip()
+    )
+    items = extract_items(transcript, snapshot)
+
+    if not items:
+        reasons.append("no_items")
+    elif not all(it.get("boundary_confident") for it in items):
+        reasons.append("boundary_not_confident")
+
+    return reasons
+
+
+def _transcribe_timed(model, audio, options, guard=nullcontext()):
+    started = time.perf_counter()
+    with guard:
+        result = model.transcribe(audio, verbose=False, **options)
+    return result, time.perf_counter() - started
+
+
+def run_cascade(models: dict, audio_paths, store=None, decode_profile=None,
+                watchdog=False, handoff_samples=None):
+    """
+    models: {"small": model, "large": model} (ExecutionControllerAgent.
+    load_cascade_models). decode_profile: decode_profiles name used by
+    both tiers (None = Whisper defaults). watchdog=True decodes both
+    tiers under data_pipeline.decode_watchdog. handoff_samples:
+    {file name: float32 array} from Phase A. Returns the report dict.
+    """
+    options = decode_options(decode_profile)
+    snapshot = load_medicine_type_snapshot()
+    handoff_samples = handoff_samples or {}
+
+    if watchdog:
+        # Imported here: torch / whisper only when the watchdog runs
+        from data_pipeline.decode_watchdog import DecodeWatchdog
+    run_id = new_run_id()
+
+    decisions = []
+
+    for audio_path in audio_paths:
+        file_name = os.path.basename(audio_path)
+
+        samples = handoff_samples.get(file_name)
+        audio_sec = (
+            len(samples) / WHISPER_SAMPLE_RATE if samples is not None
+            else audio_seconds(audio_path)
+        )
+
+        # Decoded once, shared by both tiers
+        audio = audio_input(audio_path, samples)
+
+        # One watchdog per tier: only cut-offs of the kept output count
+        guards = {t: DecodeWatchdog() for t in ("small", "large")} if watchdog else None
+
+        def guarded(tier):
+            if guards is None:
+                return nullcontext()
+            return guards[tier].guard(models[tier], audio_path)
+
+        result, small_sec = _transcribe_timed(
+            models["small"], audio, options, guarded("small")
+        )
+        reasons = escalation_reasons(result, snapshot)
+
+        tier, large_sec = "small", None
+        if reasons:
+            result, large_sec = _transcribe_timed(
+                models["large"], audio, options, guarded("large")
+            )
+            tier = "large"
+
+        cutoffs = 0
+        if guards is not None:
+            guards[tier].flag_segments(models[tier], result)
+            cutoffs = guards[tier].cutoffs.get(audio_path, 0)
+
+        if store is not None:
+            store.append(segment_rows(
+                audio_path, result, run_id, model_tier=tier, decode_profile=decode_profile
+            ))
+
+        decisions.append({
+            "file_name": file_name,
+            "model_tier": tier,
+            "reasons": ";".join(reasons),
+            "audio_sec": audio_sec,
+            "small_sec": round(small_sec, 3),
+            "large_sec": round(large_sec, 3) if large_sec is not None else None,
+            "watchdog_cutoffs": cutoffs,
+        })
+
+        print(
+            f"Transcribed: {file_name} [{tier}]"
+            + (f" escalated: {', '.join(reasons)}" if reasons else "")
+            + (f", watchdog cut off {cutoffs} decodes" if cutoffs else "")
+        )
+
+    return _build_report(decisions, decode_profile, watchdog)
+
+
+def _build_report(decisions, decode_profile=None, watchdog=False):
+    df = pd.DataFrame(
+        decisions,
+        columns=[
+            "file_name", "model_tier", "reasons", "audio_sec", "small_sec", "large_sec",
+            "watchdog_cutoffs",
+        ]
+    )
+
+    files = len(df)
+    escalated = df[df["model_tier"] == "large"]
+
+    # Actual cascade latency per file
+    df["cascade_sec"] = df["small_sec"] + df["large_sec"].fillna(0.0)
+
+    # Large-tier cost per audio second, from the escalated files
+    large_rate = (
+        escalated["large_sec"].sum() / escalated["audio_sec"].sum()
+        if len(escalated) and escalated["audio_sec"].sum() > 0
+        else None
+    )
+
+    if large_rate is not None:
+        df["large_only_sec"] = df["large_sec"].fillna(df["audio_sec"] * large_rate)
+        mean_saved = round(float((df["large_only_sec"] - df["cascade_sec"]).mean()), 3)
+    else:
+        df["large_only_sec"] = None
+        mean_saved = None
+
+    report = {
+        "files": files,
+        "decode_profile": decode_profile,
+        "watchdog_rescued": int((df["watchdog_cutoffs"] > 0).sum()) if watchdog else None,
+        "escalated": int(len(escalated)),
+        "escalation_rate": round(len(escalated) / files, 4) if files else None,
+        "mean_cascade_latency_sec": round(float(df["cascade_sec"].mean()), 3) if files else None,
+        "large_sec_per_audio_sec": round(float(large_rate), 4) if large_rate is not None else None,
+        "mean_latency_saved_sec": mean_saved,
+        "escalation_reasons": (
+            df["reasons"].str.split(";").explode().loc[lambda r: r != ""]
+              .value_counts().to_dict()
+        ),
+        "thresholds": {
+            "min_avg_logprob": CASCADE_MIN_AVG_LOGPROB,
+            "max_no_speech_prob": CASCADE_MAX_NO_SPEECH_PROB,
+            "max_compression_ratio": CASCADE_MAX_COMPRESSION_RATIO,
+        },
+    }
+
+    os.makedirs(CASCADE_DIR, exist_ok=True)
+
+    df.to_csv(CASCADE_DECISIONS_CSV, index=False)
+
+    with open(CASCADE_REPORT_JSON, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(
+        f"Phase B cascade: {report['escalated']}/{files} escalated "
+        f"(rate {report['escalation_rate']}), "
+        f"mean latency saved {mean_saved}s per file"
+    )
+    if watchdog:
+        print(
+            f"Watchdog: {report['watchdog_rescued']} of {files} files rescued "
+            f"({int(df['watchdog_cutoffs'].sum())} decodes cut off)"
+        )
+    print(f"Cascade report written → {CASCADE_REPORT_JSON}")
+
+    return report
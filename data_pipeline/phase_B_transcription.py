@@ -1,45 +1,388 @@
 import csv
 import os
+import re
+import wave
+import multiprocessing as mp
+from contextlib import nullcontext
 from datetime import datetime
 
+from data_pipeline.transcript_store import SEGMENT_COLUMNS
+from data_pipeline.audio_handoff import audio_input, WHISPER_SAMPLE_RATE
+from data_pipeline.decode_profiles import decode_options
 
-def transcribe_audio(model, audio_path, output_csv):
+# --------------------------------------------------
+# LONG-AUDIO MODE
+# --------------------------------------------------
+# Files of at least LONG_AUDIO_MIN_SEC are cut at silence
+# midpoints into ~LONG_CHUNK_SEC chunks, each extended by
+# LONG_OVERLAP_SEC on both sides, transcribed in parallel
+# (LongAudioPool: forked workers sharing the model) and
+# stitched back.
+
+LONG_AUDIO_MIN_SEC = 90.0
+LONG_CHUNK_SEC = 60.0
+LONG_OVERLAP_SEC = 2.0
+LONG_AUDIO_WORKERS = 4
+
+# Longest repeated word run removed at a chunk junction
+LONG_STITCH_MAX_WORDS = 8
+
+
+def new_run_id():
+    # Microseconds: runs started within the same second stay distinct
+    return datetime.now().strftime("run_%Y%m%d_%H%M%S_%f")
+
+
+def audio_seconds(audio_path):
+    """
+    Duration of a processed (PCM wav) audio.
+    """
+    with wave.open(audio_path, "rb") as w:
+        return w.getnframes() / w.getframerate()
+
+
+def segment_rows(audio_path, result, run_id, model_tier=None, decode_profile=None):
+    """
+    model.transcribe()-shaped result → rows in SEGMENT_COLUMNS order.
+    model_tier: cascade tier that produced the file (None = single model).
+    decode_profile: decode_profiles name (None = Whisper defaults).
+    Segment "watchdog" flags (decode_watchdog) are carried over.
+    """
+    return [
+        [
+            os.path.basename(audio_path),
+            i,
+            seg["start"],
+            seg["end"],
+            seg["end"] - seg["start"],
+            seg["text"].strip(),
+            result.get("language"),
+            audio_path,
+            run_id,
+            model_tier,
+            decode_profile,
+            seg.get("watchdog")
+        ]
+        for i, seg in enumerate(result.get("segments", []))
+    ]
+
+
+def persist_rows(rows, output_csv=None, store=None):
+    if store is not None:
+        store.append(rows)
+
+    if output_csv is not None:
+        os.makedirs(os.path.dirname(output_csv), exist_ok=True)
+
+        with open(output_csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(SEGMENT_COLUMNS)
+            writer.writerows(rows)
+
+
+def silence_cuts(samples, sr, chunk_sec=LONG_CHUNK_SEC):
+    """
+    Chunk boundaries (samples): the silence midpoint closest before each
+    chunk_sec mark (not earlier than half a chunk), else a hard cut.
+    """
+    from data_pipeline.phase_B_vad import speech_regions
+
+    regions = speech_regions(samples, sr, pad_sec=0.0)
+    midpoints = [
+        (regions[i][1] + regions[i + 1][0]) // 2
+        for i in range(len(regions) - 1)
+    ]
+
+    chunk_len = int(chunk_sec * sr)
+    cuts, start = [], 0
+
+    while len(samples) - start > chunk_len:
+        target = start + chunk_len
+        candidates = [m for m in midpoints if start + chunk_len // 2 <= m <= target]
+        cut = candidates[-1] if candidates else target
+
+        cuts.append(cut)
+        start = cut
+
+    return cuts
+
+
+# Model for forked long-audio workers (inherited copy-on-write)
+_LONG_AUDIO_MODEL = None
+
+
+def _init_long_audio_worker(threads):
+    import torch
+
+    torch.set_num_threads(threads)
+
+
+def _transcribe_chunk(args):
+    chunk_audio, options = args
+    return _LONG_AUDIO_MODEL.transcribe(chunk_audio, verbose=False, **options)
+
+
+class LongAudioPool:
+    """
+    Forked chunk workers sharing the model.
+    Create it BEFORE this process runs any inference: the GNU OpenMP
+    runtime used by torch is not fork-safe once it has been used.
+    """
+
+    def __init__(self, model, workers=LONG_AUDIO_WORKERS):
+        global _LONG_AUDIO_MODEL
+
+        import torch
+
+        _LONG_AUDIO_MODEL = model
+        self.workers = workers
+        self._pool = mp.get_context("fork").Pool(
+            processes=workers,
+            initializer=_init_long_audio_worker,
+            initargs=(max(1, torch.get_num_threads() // workers),)
+        )
+
+    def map(self, chunk_args):
+        return self._pool.map(_transcribe_chunk, chunk_args, chunksize=1)
+
+    def close(self):
+        global _LONG_AUDIO_MODEL
+
+        self._pool.close()
+        self._pool.join()
+        _LONG_AUDIO_MODEL = None
+
+
+def _words(text):
+    return [re.sub(r"[^\w.]", "", w).lower().rstrip(".") for w in text.split()]
+
+
+def _drop_repeated_words(previous_text, text, max_words=LONG_STITCH_MAX_WORDS):
+    """
+    Removes from the head of text the longest word run that repeats
+    the tail of previous_text (overlap transcribed twice).
+    """
+    prev_words, words = _words(previous_text), _words(text)
+
+    for k in range(min(max_words, len(prev_words), len(words)), 0, -1):
+        if prev_words[-k:] == words[:k] and any(words[:k]):
+            rest = text.split()[k:]
+            return " " + " ".join(rest) if rest else ""
+
+    return text
+
+
+def stitch_chunks(chunk_results, bounds, owned):
+    """
+    chunk_results[i]: transcribe() result of audio[bounds[i][0]:bounds[i][1]]
+    (seconds). Segments are kept by the chunk owning their midpoint
+    (owned[i] = [start, end) seconds); repeated words at a junction are
+    removed and timestamps made monotonic.
+    """
+    segments = []
+
+    for result, (offset, _), (own_start, own_end) in zip(chunk_results, bounds, owned):
+        first_of_chunk = True
+
+        for seg in result.get("segments", []):
+            start, end = offset + seg["start"], offset + seg["end"]
+
+            if not own_start <= (start + end) / 2 < own_end:
+                continue
+
+            text = seg["text"]
+            if first_of_chunk and segments:
+                text = _drop_repeated_words(segments[-1]["text"], text)
+            first_of_chunk = False
+
+            if not text.strip():
+                continue
+
+            if segments:
+                start = max(start, segments[-1]["end"])
+            end = max(end, start)
+
+            segments.append({**seg, "start": start, "end": end, "text": text})
+
+    return segments
+
+
+def load_samples(audio_path, samples=None):
+    """
+    float32 samples at the Whisper rate (audio_handoff; librosa when
+    the WAV needs a resample).
+    """
+    audio = audio_input(audio_path, samples)
+
+    if isinstance(audio, str):
+        import librosa
+        import numpy as np
+
+        audio, _ = librosa.load(audio_path, sr=WHISPER_SAMPLE_RATE, mono=True)
+        audio = audio.astype(np.float32)
+
+    return audio, WHISPER_SAMPLE_RATE
+
+
+def transcribe_long_audio(model, audio_path, pool=None, samples=None, options=None):
+    """
+    model.transcribe()-shaped result of a long recording (see LONG-AUDIO
+    MODE); chunks run on pool (LongAudioPool) when given, else in turn.
+    options: model.transcribe() keyword arguments (decode profile).
+    """
+    options = options or {}
+
+    samples, sr = load_samples(audio_path, samples)
+
+    cuts = [0] + silence_cuts(samples, sr) + [len(samples)]
+    overlap = int(LONG_OVERLAP_SEC * sr)
+
+    bounds, owned, chunks = [], [], []
+    for start, end in zip(cuts[:-1], cuts[1:]):
+        lo, hi = max(0, start - overlap), min(len(samples), end + overlap)
+        bounds.append((lo / sr, hi / sr))
+        owned.append((start / sr, end / sr if end < len(samples) else float("inf")))
+        chunks.append(samples[lo:hi])
+
+    # Language detected once, on the first chunk (unless pinned)
+    first = model.transcribe(chunks[0], verbose=False, **options)
+    language = first.get("language")
+
+    rest = [(chunk, {**options, "language": language}) for chunk in chunks[1:]]
+
+    if pool is not None and len(rest) > 1:
+        results = [first] + pool.map(rest)
+    else:
+        results = [first] + [
+            model.transcribe(chunk, verbose=False, **chunk_options)
+            for chunk, chunk_options in rest
+        ]
+
+    segments = stitch_chunks(results, bounds, owned)
+
+    print(
+        f"Long audio: {os.path.basename(audio_path)} "
+        f"{len(samples) / sr:.1f}s in {len(chunks)} chunks "
+        f"({'parallel' if pool is not None else 'sequential'})"
+    )
+
+    return {
+        "text": "".join(seg["text"] for seg in segments),
+        "segments": segments,
+        "language": language,
+    }
+
+
+def transcribe_audio(model, audio_path, output_csv=None, store=None, vad=False,
+                     long_audio=False, long_audio_pool=None, samples=None,
+                     decode_profile=None, watchdog=None):
     """
     Phase B — Transcription (Data Plane)
     Model is injected by Execution Controller (changes_1).
+    Segments are appended to the transcript store; output_csv
+    optionally writes the per-file CSV as well.
+    vad=True transcribes only the speech chunks (phase_B_vad);
+    timestamps stay on the original timeline.
+    long_audio=True: files >= LONG_AUDIO_MIN_SEC go through
+    transcribe_long_audio (chunks on long_audio_pool, if given).
+    samples: float32 audio handed over by Phase A (else the WAV is
+    read in-process, see audio_handoff).
+    decode_profile: data_pipeline.decode_profiles name (None = Whisper
+    defaults); recorded with the segments.
+    watchdog: data_pipeline.decode_watchdog.DecodeWatchdog; runaway decodes
+    are cut off and counted, runaway segments flagged. Chunks on
+    long_audio_pool run without it (workers forked before the guard).
     """
 
     if model is None:
         raise RuntimeError("No model provided to Phase B transcription")
 
-    result = model.transcribe(audio_path, verbose=False)
-
-    run_id = datetime.now().strftime("run_%Y%m%d_%H%M%S")
-    os.makedirs(os.path.dirname(output_csv), exist_ok=True)
-
-    with open(output_csv, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow([
-            "file_name",
-            "segment_id",
-            "start_time_sec",
-            "end_time_sec",
-            "duration_sec",
-            "raw_transcript",
-            "language",
-            "audio_path",
-            "run_id"
-        ])
-
-        for i, seg in enumerate(result.get("segments", [])):
-            writer.writerow([
-                os.path.basename(audio_path),
-                i,
-                seg["start"],
-                seg["end"],
-                seg["end"] - seg["start"],
-                seg["text"].strip(),
-                result.get("language"),
-                audio_path,
-                run_id
-            ])
+    options = decode_options(decode_profile)
+
+    if vad and long_audio:
+        raise ValueError("VAD chunking and long-audio mode are exclusive")
+
+    duration = (
+        len(samples) / WHISPER_SAMPLE_RATE if samples is not None
+        else audio_seconds(audio_path)
+    )
+
+    guard = (
+        watchdog.guard(model, audio_path) if watchdog is not None
+        else nullcontext()
+    )
+
+    with guard:
+        if long_audio and duration >= LONG_AUDIO_MIN_SEC:
+            result = transcribe_long_audio(
+                model, audio_path, long_audio_pool, samples, options
+            )
+        elif vad:
+            from data_pipeline.phase_B_vad import transcribe_speech_chunks
+
+            result = transcribe_speech_chunks(model, audio_path, samples, options)
+            print(
+                f"VAD: {os.path.basename(audio_path)} "
+                f"{result['speech_sec']:.1f}s speech of {result['audio_sec']:.1f}s"
+            )
+        else:
+            result = model.transcribe(
+                audio_input(audio_path, samples), verbose=False, **options
+            )
+
+    if watchdog is not None:
+        watchdog.flag_segments(model, result)
+
+    rows = segment_rows(audio_path, result, new_run_id(), decode_profile=decode_profile)
+    persist_rows(rows, output_csv, store)
+
+    return rows
+
+
+def transcribe_audio_batch(model, audio_paths, output_dir=None, store=None,
+                           samples=None, feature_cache=None, decode_profile=None,
+                           watchdog=None):
+    """
+    Phase B — batched variant: all audio_paths share the Whisper
+    encoder / decoder batches (data_pipeline.batched_transcription).
+    Per-file rows as transcribe_audio. samples: per-path Phase A
+    arrays (or None). feature_cache: data_pipeline.feature_cache.FeatureCache
+    of this model. decode_profile / watchdog: as transcribe_audio.
+    Returns {audio_path: (rows, audio_seconds)}.
+    """
+
+    if model is None:
+        raise RuntimeError("No model provided to Phase B transcription")
+
+    # Imported here: torch / whisper only on the batched path
+    from data_pipeline.batched_transcription import transcribe_batch
+
+    samples = samples or [None] * len(audio_paths)
+
+    results = transcribe_batch(
+        model,
+        [audio_input(path, array) for path, array in zip(audio_paths, samples)],
+        feature_cache=feature_cache,
+        options=decode_options(decode_profile),
+        watchdog=watchdog is not None
+    )
+
+    run_id = new_run_id()
+    out = {}
+
+    for audio_path, result in zip(audio_paths, results):
+        if watchdog is not None:
+            watchdog.cutoffs[audio_path] = result["watchdog_cutoffs"]
+            watchdog.flag_segments(model, result)
+
+        rows = segment_rows(audio_path, result, run_id, decode_profile=decode_profile)
+
+        output_csv = None
+        if output_dir is not None:
+            stem = os.path.splitext(os.path.basename(audio_path))[0]
+            output_csv = os.path.join(output_dir, f"transcription_{stem}.csv")
+
+        persist_rows(rows, output_csv, store)
+        out[audio_path] = (rows, result["duration"])
+
+    return out
@@ -0,0 +1,143 @@
+# ======================================================
+# PHASE B — VAD SPEECH-ONLY CHUNKING
+# ======================================================
+# Silence is not sent to Whisper:
+# 1. librosa.effects.split (same top_db as audio_quality_matrix)
+#    → speech regions, padded by VAD_PAD_SEC, overlaps merged
+# 2. regions concatenated into chunks of <= VAD_MAX_CHUNK_SEC
+#    (one Whisper window); longer regions are cut
+# 3. each chunk transcribed; segment timestamps mapped back to
+#    the ORIGINAL timeline (latency report / audit trail)
+# ======================================================
+
+import bisect
+
+import numpy as np
+import librosa
+
+# --------------------------------------------------
+# PARAMETERS
+# --------------------------------------------------
+
+VAD_SAMPLE_RATE = 16000        # Whisper input rate
+VAD_TOP_DB = 30                # audio_quality_matrix silence threshold
+VAD_PAD_SEC = 0.2              # keep_silence_ms of Phase A
+VAD_MAX_CHUNK_SEC = 30.0       # one Whisper window
+
+
+def speech_regions(samples: np.ndarray, sr: int = VAD_SAMPLE_RATE,
+                   top_db: float = VAD_TOP_DB, pad_sec: float = VAD_PAD_SEC):
+    """
+    Padded, merged (start, end) sample intervals of speech.
+    """
+    pad = int(pad_sec * sr)
+    regions = []
+
+    for start, end in librosa.effects.split(samples, top_db=top_db):
+        start = max(0, int(start) - pad)
+        end = min(len(samples), int(end) + pad)
+
+        if regions and start <= regions[-1][1]:
+            regions[-1][1] = max(regions[-1][1], end)
+        else:
+            regions.append([start, end])
+
+    return [(start, end) for start, end in regions]
+
+
+def build_chunks(regions, sr: int = VAD_SAMPLE_RATE,
+                 max_chunk_sec: float = VAD_MAX_CHUNK_SEC):
+    """
+    Regions packed into chunks of <= max_chunk_sec of audio.
+    Chunk = list of pieces (original_start, original_end) in samples.
+    """
+    max_len = int(max_chunk_sec * sr)
+    chunks, current, current_len = [], [], 0
+
+    for start, end in regions:
+        while start < end:
+            take = min(end - start, max_len - current_len)
+
+            current.append((start, start + take))
+            current_len += take
+            start += take
+
+            if current_len == max_len:
+                chunks.append(current)
+                current, current_len = [], 0
+
+    if current:
+        chunks.append(current)
+
+    return chunks
+
+
+class TimelineMap:
+    """
+    Chunk time (seconds) → original time, piecewise linear.
+    """
+
+    __slots__ = ("chunk_starts", "original_starts", "lengths")
+
+    def __init__(self, pieces, sr: int = VAD_SAMPLE_RATE):
+        self.chunk_starts, self.original_starts, self.lengths = [], [], []
+
+        offset = 0
+        for start, end in pieces:
+            self.chunk_starts.append(offset / sr)
+            self.original_starts.append(start / sr)
+            self.lengths.append((end - start) / sr)
+            offset += end - start
+
+    def to_original(self, t: float, is_end: bool = False) -> float:
+        # A segment end exactly on a piece boundary belongs to the piece it ends
+        if is_end:
+            i = bisect.bisect_left(self.chunk_starts, t) - 1
+        else:
+            i = bisect.bisect_right(self.chunk_starts, t) - 1
+
+        i = min(max(i, 0), len(self.chunk_starts) - 1)
+
+        within = min(max(t - self.chunk_starts[i], 0.0), self.lengths[i])
+        return self.original_starts[i] + within
+
+
+def transcribe_speech_chunks(model, audio_path: str, samples=None, options=None) -> dict:
+    """
+    model.transcribe()-shaped result of the speech chunks of audio_path,
+    timestamps on the original timeline. Adds "audio_sec" / "speech_sec".
+    samples: float32 audio handed over by Phase A.
+    options: model.transcribe() keyword arguments (decode profile).
+    """
+    from data_pipeline.phase_B_transcription import load_samples
+
+    samples, sr = load_samples(audio_path, samples)
+
+    chunks = build_chunks(speech_regions(samples, sr), sr)
+
+    options = dict(options or {})
+    segments = []
+    language = options.pop("language", None)
+
+    for pieces in chunks:
+        chunk_audio = np.concatenate([samples[start:end] for start, end in pieces])
+        timeline = TimelineMap(pieces, sr)
+
+        # Language detected on the first chunk (unless pinned), reused afterwards
+        result = model.transcribe(chunk_audio, verbose=False, language=language, **options)
+        language = language or result.get("language")
+
+        for seg in result.get("segments", []):
+            segments.append({
+                **seg,
+                "start": timeline.to_original(seg["start"]),
+                "end": timeline.to_original(seg["end"], is_end=True),
+            })
+
+    return {
+        "text": "".join(seg["text"] for seg in segments),
+        "segments": segments,
+        "language": language,
+        "audio_sec": len(samples) / sr,
+        "speech_sec": sum(end - start for pieces in chunks for start, end in pieces) / sr,
+    }
@@ -32,7 +32,9 @@ def build_alias_lookup():
     token_map = {}
 
     for canon, aliases in MED_TYPE_ALIAS_MAP.items():
-        for a in aliases:
+        # Deterministic order (sets iterate by string hash):
+        # longer aliases first, so ORAL SOLUTION LIQUID beats ORAL
+        for a in sorted(aliases, key=lambda a: (-len(a.split()), a)):
             alias_lookup[a] = canon
             token_map[a] = a.split()
 
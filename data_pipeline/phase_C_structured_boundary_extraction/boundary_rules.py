@@ -3,9 +3,65 @@
 # ======================================================
 
 import re
+from typing import List, NamedTuple
 
 STOPWORD_TOKENS = {"AND", "SAID"}
 
+# ------------------------------------------------------
+# COMPILED LEXER
+# ------------------------------------------------------
+# One pass over the upper-cased transcript. Every alternative
+# consumes a whole [A-Z0-9.] run (negative lookahead), so the
+# tokens equal normalize_tokens(tokenize(text)):
+#   DOLO650 → DOLO 650     4TAB → 4 TAB     2.5 stays 2.5
+
+WORD = "WORD"
+NUMBER = "NUMBER"      # 4, 650, 4. (is_quantity)
+DECIMAL = "DECIMAL"    # 2.5
+COMMA = "COMMA"
+
+_LEXER = re.compile(r"""
+      (?P<ALPHA_NUM>(?P<an_word>[A-Z]+)(?P<an_number>[0-9]+))(?![A-Z0-9.])
+    | (?P<NUM_ALPHA>(?P<na_number>[0-9]+)(?P<na_word>[A-Z]+))(?![A-Z0-9.])
+    | (?P<NUMBER>[0-9]+\.*)(?![A-Z0-9.])
+    | (?P<DECIMAL>[0-9]*\.[0-9]+\.*)(?![A-Z0-9.])
+    | (?P<WORD>[A-Z0-9.]+)
+    | (?P<COMMA>,)
+""", re.VERBOSE)
+
+
+class Token(NamedTuple):
+    text: str
+    kind: str
+    start: int   # character offsets into text.upper()
+    end: int
+
+
+def lex(text: str) -> List[Token]:
+    """
+    Typed tokens (WORD / NUMBER / DECIMAL / COMMA) with offsets,
+    glued alpha-numeric tokens already split.
+    """
+    tokens = []
+
+    for m in _LEXER.finditer(text.upper()):
+        kind = m.lastgroup
+
+        if kind == "ALPHA_NUM":
+            tokens.append(Token(m["an_word"], WORD, m.start(), m.end("an_word")))
+            tokens.append(Token(m["an_number"], NUMBER, m.start("an_number"), m.end()))
+        elif kind == "NUM_ALPHA":
+            tokens.append(Token(m["na_number"], NUMBER, m.start(), m.end("na_number")))
+            tokens.append(Token(m["na_word"], WORD, m.start("na_word"), m.end()))
+        else:
+            tokens.append(Token(m.group(), kind, m.start(), m.end()))
+
+    return tokens
+
+# ------------------------------------------------------
+# STRING-LEVEL RULES (reference / external callers)
+# ------------------------------------------------------
+
 
 def tokenize(text: str):
     """
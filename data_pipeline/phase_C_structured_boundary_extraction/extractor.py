@@ -4,9 +4,9 @@
 # ======================================================
 
 from .boundary_rules import (
-    tokenize,
-    normalize_tokens,
-    is_quantity,
+    lex,
+    NUMBER,
+    COMMA,
     is_valid_medicine_name,
 )
 
@@ -16,6 +16,8 @@ from .boundary_rules import (
 
 MAX_PREFIX_LEN = 4  # AND, AM, AN, OD, XR, etc.
 
+QUANTITY_LOOKAHEAD = 8  # tokens after the medicine type searched for a quantity
+
 # ------------------------------------------------------
 # HELPERS
 # ------------------------------------------------------
@@ -70,6 +72,10 @@ def _attempt_parametric_prefix_merge(tokens):
 # ------------------------------------------------------
 
 def match_medicine_type(tokens, idx, token_map, alias_lookup):
+    """
+    Linear reference matcher: first alias in token_map order.
+    extract_items uses the snapshot's MedicineTypeTrie when present.
+    """
     for alias, parts in token_map.items():
         if tokens[idx:idx + len(parts)] == parts:
             return alias_lookup[alias], len(parts)
@@ -80,20 +86,23 @@ def match_medicine_type(tokens, idx, token_map, alias_lookup):
 # QUANTITY FINDER
 # ------------------------------------------------------
 
-def find_quantity(tokens, start_idx, lookahead=8):
+def find_quantity(lexed, start_idx, lookahead=QUANTITY_LOOKAHEAD):
+    """
+    lexed: typed tokens from boundary_rules.lex
+    """
     j = start_idx
     steps = 0
 
-    while j < len(tokens) and steps <= lookahead:
-        tok = tokens[j]
+    while j < len(lexed) and steps <= lookahead:
+        tok = lexed[j]
 
-        if tok == ",":
+        if tok.kind == COMMA:
             j += 1
             steps += 1
             continue
 
-        if is_quantity(tok):
-            return tok.rstrip("., "), j
+        if tok.kind == NUMBER:
+            return tok.text.rstrip("."), j
 
         j += 1
         steps += 1
@@ -101,15 +110,58 @@ def find_quantity(tokens, start_idx, lookahead=8):
     return None, None
 
 
+# ------------------------------------------------------
+# ORDER LINE
+# ------------------------------------------------------
+
+def close_order_line(tokens, seg_start, i, tlen, med_type, qty, qty_idx):
+    """
+    Order line for a medicine type at tokens[i:i + tlen] whose name
+    starts at seg_start. Returns (order_key, item without position,
+    end_idx of the closed segment).
+    """
+    predicted_tokens = tokens[seg_start:i]
+
+    # Strip trailing ML
+    if predicted_tokens and is_ml_token(predicted_tokens[-1]):
+        predicted_tokens = predicted_tokens[:-1]
+
+    # 🔒 PARAMETRIC PREFIX REPAIR
+    predicted_tokens = _attempt_parametric_prefix_merge(
+        predicted_tokens
+    )
+
+    predicted = _strip_leading_delimiters(
+        " ".join(predicted_tokens).strip()
+    )
+
+    if not predicted or not is_valid_medicine_name(predicted):
+        predicted = "UNKNOWN"
+
+    end_idx = (qty_idx + 1) if qty else i + tlen
+
+    item = {
+        "text_span": " ".join(tokens[seg_start:end_idx]),
+        "raw_name": predicted,
+        "raw_form": med_type,
+        "raw_quantity": qty,
+        "boundary_confident": qty is not None
+    }
+
+    return (predicted, med_type, qty), item, end_idx
+
+
 # ------------------------------------------------------
 # CORE EXTRACTION
 # ------------------------------------------------------
 
 def extract_items(raw_transcript: str, snapshot: dict):
-    tokens = normalize_tokens(tokenize(raw_transcript))
+    lexed = lex(raw_transcript)
+    tokens = [tok.text for tok in lexed]
 
     alias_lookup = snapshot["alias_lookup"]
     token_map = snapshot["token_map"]
+    type_trie = snapshot.get("type_trie")
 
     items = []
     seen_order_lines = set()
@@ -119,44 +171,22 @@ def extract_items(raw_transcript: str, snapshot: dict):
     i = 0
 
     while i < len(tokens):
-        med_type, tlen = match_medicine_type(tokens, i, token_map, alias_lookup)
+        if type_trie is not None:
+            med_type, tlen = type_trie.match(tokens, i)
+        else:
+            med_type, tlen = match_medicine_type(tokens, i, token_map, alias_lookup)
 
         if med_type:
-            qty, qty_idx = find_quantity(tokens, i + tlen)
-
-            predicted_tokens = tokens[seg_start:i]
+            qty, qty_idx = find_quantity(lexed, i + tlen)
 
-            # Strip trailing ML
-            if predicted_tokens and is_ml_token(predicted_tokens[-1]):
-                predicted_tokens = predicted_tokens[:-1]
-
-            # 🔒 PARAMETRIC PREFIX REPAIR
-            predicted_tokens = _attempt_parametric_prefix_merge(
-                predicted_tokens
-            )
-
-            predicted = _strip_leading_delimiters(
-                " ".join(predicted_tokens).strip()
+            order_key, item, end_idx = close_order_line(
+                tokens, seg_start, i, tlen, med_type, qty, qty_idx
             )
 
-            if not predicted or not is_valid_medicine_name(predicted):
-                predicted = "UNKNOWN"
-
-            end_idx = (qty_idx + 1) if qty else i + tlen
-
-            order_key = (predicted, med_type, qty)
-
             if order_key not in seen_order_lines:
                 seen_order_lines.add(order_key)
 
-                items.append({
-                    "position": pos,
-                    "text_span": " ".join(tokens[seg_start:end_idx]),
-                    "raw_name": predicted,
-                    "raw_form": med_type,
-                    "raw_quantity": qty,
-                    "boundary_confident": qty is not None
-                })
+                items.append({"position": pos, **item})
                 pos += 1
 
             seg_start = _skip_delimiters(tokens, end_idx)
@@ -0,0 +1,58 @@
+# ======================================================
+# MEDICINE TYPE TOKEN TRIE
+# ======================================================
+# Alias registry compiled into a token-level trie:
+#   DRY → SYRUP            (DRY SYRUP)
+#   ORAL → SOLUTION → LIQUID (ORAL SOLUTION LIQUID)
+#
+# - Lookup walks at most the longest alias (3 tokens) from
+#   a position, independent of the number of aliases
+# - Same winner as the linear token_map scan: among the
+#   aliases matching at a position, the one earliest in
+#   token_map order wins (see build_alias_lookup)
+# ======================================================
+
+# Terminal marker inside a trie node (never a token)
+_TERMINAL = None
+
+
+class MedicineTypeTrie:
+
+    __slots__ = ("root", "max_alias_len")
+
+    def __init__(self, token_map: dict, alias_lookup: dict):
+        self.root = {}
+        self.max_alias_len = 0
+
+        for rank, (alias, parts) in enumerate(token_map.items()):
+            if not parts:
+                continue
+
+            node = self.root
+            for part in parts:
+                node = node.setdefault(part, {})
+
+            node[_TERMINAL] = (rank, alias_lookup[alias], len(parts))
+            self.max_alias_len = max(self.max_alias_len, len(parts))
+
+    def match(self, tokens, idx):
+        """
+        (canonical MEDICINE_TYPE, alias token length) at tokens[idx],
+        or (None, 0) — same contract as match_medicine_type.
+        """
+        node = self.root
+        best = None
+
+        for j in range(idx, len(tokens)):
+            node = node.get(tokens[j])
+            if node is None:
+                break
+
+            terminal = node.get(_TERMINAL)
+            if terminal is not None and (best is None or terminal[0] < best[0]):
+                best = terminal
+
+        if best is None:
+            return None, 0
+
+        return best[1], best[2]
@@ -12,15 +12,24 @@
 import os
 import json
 import re
+import time
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 
 from .snapshot_loader import load_medicine_type_snapshot
 from .extractor import extract_items
+from ..transcript_store import open_transcript_store, csv_stem
 
 # ------------------------------------------------------
 # PATHS
 # ------------------------------------------------------
 
+TRANSCRIPT_STORE_DB = (
+    r"D:\new_p_voice_ai_v3\data_pipeline\artifacts"
+    r"\transcript_store\transcripts.sqlite"
+)
+
+# Former per-file transcription CSVs (imported into an empty store)
 TRANSCRIPT_DIR = r"D:\new_p_voice_ai_v3\data_pipeline\artifacts\transcripts_raw"
 OUTPUT_DIR = r"D:\new_p_voice_ai_v3\data_pipeline\artifacts\structured_boundary_extraction"
 CONSOLIDATED_CSV = os.path.join(
@@ -45,84 +54,154 @@ def extract_numeric_index(file_name: str) -> int:
 
 
 # ------------------------------------------------------
-# MAIN
+# PER-FILE EXTRACTION (sequential or pool worker)
 # ------------------------------------------------------
 
-def run_phase_C():
-    print("Starting Phase C — Structured Boundary Extraction")
+# Compiled MEDICINE_TYPE snapshot, loaded once per worker process
+_WORKER_SNAPSHOT = None
+
+
+def _init_worker():
+    global _WORKER_SNAPSHOT
+    _WORKER_SNAPSHOT = load_medicine_type_snapshot()
+
+
+def process_transcript(stem: str, df: pd.DataFrame, snapshot: dict = None):
+    """
+    Extracts the segments of one audio (columns file_name, segment_id,
+    raw_transcript). Returns (stem, extracted_items, consolidated_rows,
+    seconds).
+    """
+    started = time.perf_counter()
+    snapshot = snapshot or _WORKER_SNAPSHOT
 
     # --------------------------------------------------
-    # Load frozen MEDICINE_TYPE snapshot
+    # Aggregate segments into ONE logical transcript
     # --------------------------------------------------
-    snapshot = load_medicine_type_snapshot()
+    grouped = (
+        df.sort_values("segment_id")
+          .groupby("file_name", as_index=False)["raw_transcript"]
+          .apply(lambda x: " ".join(s.strip() for s in x if s.strip()))
+    )
 
+    extracted_items = []
     consolidated_rows = []
 
     # --------------------------------------------------
-    # Process each transcription CSV
+    # Run Phase C extraction per audio file
     # --------------------------------------------------
-    for file in sorted(os.listdir(TRANSCRIPT_DIR)):
-        if not file.lower().endswith(".csv"):
-            continue
-
-        csv_path = os.path.join(TRANSCRIPT_DIR, file)
-        df = pd.read_csv(csv_path)
-
-        required_cols = {"file_name", "segment_id", "raw_transcript"}
-        if not required_cols.issubset(df.columns):
-            raise ValueError(
-                f"Missing required columns in {file}: "
-                f"{required_cols - set(df.columns)}"
-            )
+    for _, row in grouped.iterrows():
+        full_transcript = row["raw_transcript"]
+        file_name = row["file_name"]
+
+        items = extract_items(full_transcript, snapshot)
+
+        for it in items:
+            it["file_name"] = file_name
+            extracted_items.append(it)
+
+            consolidated_rows.append({
+                "file_name": file_name,
+                "position": it.get("position"),
+                "raw_name": it.get("raw_name"),
+                "raw_form": it.get("raw_form"),
+                "raw_quantity": (
+                    pd.to_numeric(it.get("raw_quantity"), errors="coerce")
+                ),
+                "boundary_confident": it.get("boundary_confident"),
+                "text_span": it.get("text_span")
+            })
+
+    return stem, extracted_items, consolidated_rows, time.perf_counter() - started
 
-        # --------------------------------------------------
-        # Aggregate segments into ONE logical transcript
-        # --------------------------------------------------
-        grouped = (
-            df.sort_values("segment_id")
-              .groupby("file_name", as_index=False)["raw_transcript"]
-              .apply(lambda x: " ".join(s.strip() for s in x if s.strip()))
-        )
 
-        extracted_items = []
-
-        # --------------------------------------------------
-        # Run Phase C extraction per audio file
-        # --------------------------------------------------
-        for _, row in grouped.iterrows():
-            full_transcript = row["raw_transcript"]
-            file_name = row["file_name"]
-
-            items = extract_items(full_transcript, snapshot)
-
-            for it in items:
-                it["file_name"] = file_name
-                extracted_items.append(it)
-
-                consolidated_rows.append({
-                    "file_name": file_name,
-                    "position": it.get("position"),
-                    "raw_name": it.get("raw_name"),
-                    "raw_form": it.get("raw_form"),
-                    "raw_quantity": (
-                        pd.to_numeric(it.get("raw_quantity"), errors="coerce")
-                    ),
-                    "boundary_confident": it.get("boundary_confident"),
-                    "text_span": it.get("text_span")
-                })
-
-        # --------------------------------------------------
-        # Save per-file structured JSON
-        # --------------------------------------------------
-        output_path = os.path.join(
-            OUTPUT_DIR,
-            file.replace(".csv", "_structured.json")
+# ------------------------------------------------------
+# MAIN
+# ------------------------------------------------------
+
+def run_phase_C(workers=1, store_db=None, output_dir=None, legacy_csv_dir=None):
+    """
+    workers: 1 = sequential; >1 = process pool over audio files
+             (None = all cores). Artifacts are byte-identical either way.
+    store_db / output_dir: default TRANSCRIPT_STORE_DB / OUTPUT_DIR
+    legacy_csv_dir: CSVs imported into an empty store (default TRANSCRIPT_DIR)
+    Returns the consolidated CSV path.
+    """
+    store_db = store_db or TRANSCRIPT_STORE_DB
+    output_dir = output_dir or OUTPUT_DIR
+    consolidated_csv = (
+        CONSOLIDATED_CSV if output_dir == OUTPUT_DIR
+        else os.path.join(output_dir, os.path.basename(CONSOLIDATED_CSV))
+    )
+    if legacy_csv_dir is None:
+        legacy_csv_dir = TRANSCRIPT_DIR
+    os.makedirs(output_dir, exist_ok=True)
+
+    print("Starting Phase C — Structured Boundary Extraction")
+
+    started = time.perf_counter()
+
+    # --------------------------------------------------
+    # Latest transcript of every audio (3 columns only)
+    # --------------------------------------------------
+    store = open_transcript_store(store_db, legacy_csv_dir)
+    segments_df = store.read(["file_name", "segment_id", "raw_transcript"])
+    store.close()
+
+    per_file = {
+        csv_stem(file_name): group
+        for file_name, group in segments_df.groupby("file_name")
+    }
+    stems = sorted(per_file)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(stems) or 1))
+
+    print(f"Phase C workers: {workers}")
+
+    # --------------------------------------------------
+    # Extract each audio transcript
+    # --------------------------------------------------
+    if workers == 1:
+        # Load frozen MEDICINE_TYPE snapshot
+        snapshot = load_medicine_type_snapshot()
+        results = (
+            process_transcript(stem, per_file[stem], snapshot)
+            for stem in stems
         )
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        # map() yields in submission (sorted) order
+        results = pool.map(
+            process_transcript,
+            stems,
+            [per_file[stem] for stem in stems],
+            chunksize=max(1, len(stems) // (4 * workers))
+        )
+
+    consolidated_rows = []
+
+    try:
+        for stem, extracted_items, file_rows, seconds in results:
+            consolidated_rows.extend(file_rows)
 
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(extracted_items, f, indent=2, ensure_ascii=False)
+            # --------------------------------------------------
+            # Save per-file structured JSON
+            # --------------------------------------------------
+            output_path = os.path.join(
+                output_dir,
+                f"{stem}_structured.json"
+            )
 
-        print(f"Phase C JSON written → {output_path}")
+            with open(output_path, "w", encoding="utf-8") as f:
+                json.dump(extracted_items, f, indent=2, ensure_ascii=False)
+
+            print(f"Phase C JSON written → {output_path} ({seconds:.3f}s)")
+    finally:
+        if pool is not None:
+            pool.shutdown()
 
     # --------------------------------------------------
     # Save consolidated CSV (NUMERIC SORT FIX)
@@ -142,19 +221,31 @@ def run_phase_C():
         consolidated_df.drop(columns="_file_index", inplace=True)
 
         consolidated_df.to_csv(
-            CONSOLIDATED_CSV,
+            consolidated_csv,
             index=False
         )
 
-        print(f"Consolidated CSV written → {CONSOLIDATED_CSV}")
+        print(f"Consolidated CSV written → {consolidated_csv}")
+
+    print(
+        f"Phase C finished successfully. "
+        f"({len(stems)} files, {workers} workers, "
+        f"{time.perf_counter() - started:.2f}s)"
+    )
 
-    print("Phase C finished successfully.")
+    return consolidated_csv
 
 
 if __name__ == "__main__":
     # Execute as module:
     # python -m data_pipeline.phase_C_structured_boundary_extraction.run_phase_C
-    run_phase_C()
+    # python -m data_pipeline.phase_C_structured_boundary_extraction.run_phase_C --workers=4
+    import sys
+    workers = next(
+        (int(arg.split("=", 1)[1]) for arg in sys.argv if arg.startswith("--workers=")),
+        1
+    )
+    run_phase_C(workers=workers)
 
 
 
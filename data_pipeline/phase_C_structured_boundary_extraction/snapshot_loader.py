@@ -3,6 +3,7 @@
 # ======================================================
 
 from .alias_registry import build_alias_lookup
+from .medicine_type_trie import MedicineTypeTrie
 
 
 def load_medicine_type_snapshot():
@@ -11,5 +12,6 @@ def load_medicine_type_snapshot():
     return {
         "alias_lookup": alias_lookup,
         "token_map": token_map,
+        "type_trie": MedicineTypeTrie(token_map, alias_lookup),
         "canonical_types": sorted(set(alias_lookup.values()))
     }
@@ -0,0 +1,154 @@
+# ======================================================
+# PHASE C — STREAMING / INCREMENTAL EXTRACTION
+# ======================================================
+# Live Whisper segments in, order lines out as soon as their
+# boundary is closed:
+#   - medicine type decided once max_alias_len tokens follow
+#   - quantity decided once found, or after the lookahead
+#     window has fully arrived
+# Only the unfinished tail (from the current name start)
+# is kept as state.
+#
+# Feeding the segments of a transcript and calling finish()
+# yields exactly extract_items(" ".join(segments), snapshot).
+# ======================================================
+
+from .boundary_rules import lex, NUMBER, COMMA
+from .extractor import close_order_line, QUANTITY_LOOKAHEAD
+from .medicine_type_trie import MedicineTypeTrie
+
+_PENDING = object()
+
+
+def _find_quantity_partial(lexed, start_idx, final, lookahead=QUANTITY_LOOKAHEAD):
+    """
+    find_quantity over a token buffer that may still grow.
+    Returns _PENDING when more tokens could change the answer.
+    """
+    j = start_idx
+    steps = 0
+
+    while j < len(lexed) and steps <= lookahead:
+        tok = lexed[j]
+
+        if tok.kind == NUMBER:
+            return tok.text.rstrip("."), j
+
+        j += 1
+        steps += 1
+
+    if steps > lookahead or final:
+        return None, None
+
+    return _PENDING
+
+
+class StreamingExtractor:
+    """
+    extractor = StreamingExtractor(snapshot)
+    for segment in segments:
+        confirm(extractor.feed(segment))
+    confirm(extractor.finish())
+    """
+
+    def __init__(self, snapshot: dict):
+        self.type_trie = snapshot.get("type_trie") or MedicineTypeTrie(
+            snapshot["token_map"], snapshot["alias_lookup"]
+        )
+
+        self.items = []
+        self._seen_order_lines = set()
+
+        # Unfinished tail: tokens from the current name start
+        self._lexed = []
+        self._tokens = []
+        self._i = 0
+        self._skip_delimiters = False
+        self._finished = False
+
+    def feed(self, segment: str):
+        """
+        Adds one transcript segment; returns the order lines it closed.
+        """
+        if self._finished:
+            raise RuntimeError("StreamingExtractor already finished")
+
+        segment = segment.strip() if isinstance(segment, str) else ""
+        if segment:
+            lexed = lex(segment)
+            self._lexed.extend(lexed)
+            self._tokens.extend(tok.text for tok in lexed)
+
+        return self._advance(final=False)
+
+    def finish(self):
+        """
+        End of the call; closes every remaining boundary.
+        """
+        if self._finished:
+            return []
+
+        emitted = self._advance(final=True)
+        self._finished = True
+
+        return emitted
+
+    def _advance(self, final):
+        emitted = []
+        tokens = self._tokens
+
+        while True:
+            if self._skip_delimiters:
+                while self._i < len(tokens) and self._lexed[self._i].kind == COMMA:
+                    self._i += 1
+
+                if self._i == len(tokens) and not final:
+                    break
+
+                self._skip_delimiters = False
+                self._drop_consumed()
+                tokens = self._tokens
+
+            i = self._i
+            if i >= len(tokens):
+                break
+
+            # Medicine type needs the longest alias window
+            if not final and i + self.type_trie.max_alias_len > len(tokens):
+                break
+
+            med_type, tlen = self.type_trie.match(tokens, i)
+
+            if not med_type:
+                self._i += 1
+                continue
+
+            found = _find_quantity_partial(self._lexed, i + tlen, final)
+            if found is _PENDING:
+                break
+
+            qty, qty_idx = found
+
+            order_key, item, end_idx = close_order_line(
+                tokens, 0, i, tlen, med_type, qty, qty_idx
+            )
+
+            if order_key not in self._seen_order_lines:
+                self._seen_order_lines.add(order_key)
+
+                item = {"position": len(self.items), **item}
+                self.items.append(item)
+                emitted.append(item)
+
+            self._i = end_idx
+            self._skip_delimiters = True
+
+        return emitted
+
+    def _drop_consumed(self):
+        """
+        Tokens before the next name start are no longer needed.
+        """
+        del self._lexed[:self._i]
+        del self._tokens[:self._i]
+        self._i = 0
@@ -0,0 +1,88 @@
+# ======================================================
+# PHASE C — MEDICINE TYPE MATCHER DIFFERENTIAL CHECK
+# ======================================================
+# MedicineTypeTrie vs the linear match_medicine_type scan:
+# 1. every alias alone, with a neighbour token, and every
+#    ordered alias pair (overlapping multi-token aliases)
+# 2. every token position of the raw transcripts
+# 3. extract_items output per transcript, trie vs linear
+# Any disagreement raises.
+# ======================================================
+
+import itertools
+
+from .snapshot_loader import load_medicine_type_snapshot
+from .extractor import match_medicine_type, extract_items
+from .boundary_rules import lex
+from .run_phase_C import TRANSCRIPT_STORE_DB, TRANSCRIPT_DIR
+from ..transcript_store import open_transcript_store
+
+
+def _synthetic_sequences(token_map):
+    aliases = list(token_map.values())
+
+    for parts in aliases:
+        yield parts
+        yield ["DOLO"] + parts + ["2"]
+        yield parts + [","] + parts
+
+    for a, b in itertools.product(aliases, repeat=2):
+        yield a + b
+
+
+def _load_transcripts(store_db, legacy_csv_dir):
+    store = open_transcript_store(store_db, legacy_csv_dir)
+    df = store.read(["file_name", "segment_id", "raw_transcript"])
+    store.close()
+
+    for file_name, group in df.groupby("file_name"):
+        yield file_name, " ".join(
+            s.strip() for s in group["raw_transcript"] if s.strip()
+        )
+
+
+def run_differential_check(store_db=TRANSCRIPT_STORE_DB, legacy_csv_dir=TRANSCRIPT_DIR):
+    snapshot = load_medicine_type_snapshot()
+    alias_lookup = snapshot["alias_lookup"]
+    token_map = snapshot["token_map"]
+    trie = snapshot["type_trie"]
+
+    linear_snapshot = {k: v for k, v in snapshot.items() if k != "type_trie"}
+
+    mismatches = []
+    positions = 0
+
+    def compare(tokens, source):
+        nonlocal positions
+        for idx in range(len(tokens)):
+            positions += 1
+            expected = match_medicine_type(tokens, idx, token_map, alias_lookup)
+            got = trie.match(tokens, idx)
+            if got != expected:
+                mismatches.append((source, tokens[idx:idx + 4], expected, got))
+
+    for parts in _synthetic_sequences(token_map):
+        compare(parts, "synthetic")
+
+    transcripts = 0
+    for file_name, transcript in _load_transcripts(store_db, legacy_csv_dir):
+        transcripts += 1
+        compare([tok.text for tok in lex(transcript)], file_name)
+
+        if extract_items(transcript, snapshot) != extract_items(transcript, linear_snapshot):
+            mismatches.append((file_name, "extract_items", None, None))
+
+    print(
+        f"Medicine type matcher: {positions} positions, "
+        f"{transcripts} transcripts, {len(mismatches)} mismatches"
+    )
+
+    if mismatches:
+        raise AssertionError(f"Trie / linear matcher mismatch: {mismatches[:10]}")
+
+    return positions
+
+
+if __name__ == "__main__":
+    # python -m data_pipeline.phase_C_structured_boundary_extraction.verify_type_matcher
+    run_differential_check()
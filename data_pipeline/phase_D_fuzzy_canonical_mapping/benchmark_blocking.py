@@ -0,0 +1,141 @@
+# ======================================================
+# PHASE D — CANDIDATE BLOCKING BENCHMARK
+# ======================================================
+# Compares first-stage blockers against brute-force
+# compute_fuzzy_scores on the ground-truth order set:
+# - candidate-set size (mean / median / p95)
+# - latency per row (blocking + RapidFuzz scoring)
+# - top-1 recall vs the brute-force winner
+# - top-1 accuracy vs the ground-truth name
+# ======================================================
+
+import os
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from .catalog_snapshot import load_master_snapshot
+from .fuzzy_matcher import compute_fuzzy_scores
+from .text_normalizer import normalize_for_matching
+from .phonetic_index import BLOCK_FALLBACK_THRESHOLD
+from .tfidf_retriever import TfidfRetriever
+from .run_phase_D import (
+    PHASE_C_CSV,
+    MASTER_PATH,
+    CATALOG_CACHE_DIR,
+    OUTPUT_DIR,
+)
+from ..phase_E_evaluation_audit.load_inputs import load_ground_truth
+
+GROUND_TRUTH_XLSX = r"D:\new_p_voice_ai_v3\Data_Base\_ground_truth.xlsx"
+
+BENCHMARK_JSON = os.path.join(OUTPUT_DIR, "phase_D_blocking_benchmark.json")
+
+
+def _blockers(snapshot):
+    """
+    name → (candidates(query), fallback_threshold)
+    """
+    catalog = snapshot["catalog"]
+    retriever = TfidfRetriever(catalog.names)
+
+    return {
+        "brute": (lambda q: catalog.names, None),
+        "tfidf": (lambda q: retriever.candidates([q])[0], None),
+        "ngram": (snapshot["candidate_index"].candidates, None),
+        "phonetic": (snapshot["phonetic_index"].candidates, None),
+        "phonetic+fallback": (
+            snapshot["phonetic_index"].candidates,
+            BLOCK_FALLBACK_THRESHOLD
+        ),
+    }
+
+
+def run_blocking_benchmark():
+    print("Phase D — Candidate Blocking Benchmark")
+
+    snapshot = load_master_snapshot(MASTER_PATH, CATALOG_CACHE_DIR)
+    catalog = snapshot["catalog"]
+
+    phase_c_df = pd.read_csv(PHASE_C_CSV)
+    gt_df = load_ground_truth(GROUND_TRUTH_XLSX)
+
+    if len(phase_c_df) != len(gt_df):
+        raise ValueError(
+            f"Row count mismatch: phase_c={len(phase_c_df)} gt={len(gt_df)}"
+        )
+
+    queries = [
+        normalize_for_matching(name) if isinstance(name, str) else ""
+        for name in phase_c_df["raw_name"]
+    ]
+    gt_names = gt_df["GT_NAME"].tolist()
+
+    brute_best = [
+        compute_fuzzy_scores(q, catalog.names)[0] if q else None
+        for q in queries
+    ]
+
+    report = {}
+
+    for name, (candidates_of, fallback_threshold) in _blockers(snapshot).items():
+        sizes, latencies = [], []
+        recall_hits = gt_hits = fallbacks = rows = 0
+
+        for q, brute, gt_name in zip(queries, brute_best, gt_names):
+            if not q:
+                continue
+
+            started = time.perf_counter()
+
+            candidates = candidates_of(q)
+            best = compute_fuzzy_scores(q, candidates)[0]
+
+            if fallback_threshold is not None and best["score"] < fallback_threshold:
+                best = compute_fuzzy_scores(q, catalog.names)[0]
+                fallbacks += 1
+
+            latencies.append(time.perf_counter() - started)
+            sizes.append(len(candidates))
+
+            rows += 1
+            recall_hits += best == brute
+            gt_hits += best["candidate"].strip().upper() == gt_name
+
+        report[name] = {
+            "rows": rows,
+            "catalog_size": len(catalog),
+            "mean_candidates": round(float(np.mean(sizes)), 2),
+            "median_candidates": float(np.median(sizes)),
+            "p95_candidates": float(np.percentile(sizes, 95)),
+            "mean_latency_ms": round(1000 * float(np.mean(latencies)), 4),
+            "total_latency_sec": round(float(np.sum(latencies)), 4),
+            "top1_recall_vs_brute": round(recall_hits / rows, 4),
+            "top1_accuracy_vs_gt": round(gt_hits / rows, 4),
+            "full_catalog_fallbacks": fallbacks,
+        }
+
+    print(
+        f"{'blocker':<20}{'mean cand':>10}{'p95':>8}"
+        f"{'ms/row':>10}{'recall':>9}{'gt acc':>9}"
+    )
+    for name, r in report.items():
+        print(
+            f"{name:<20}{r['mean_candidates']:>10}{r['p95_candidates']:>8}"
+            f"{r['mean_latency_ms']:>10}{r['top1_recall_vs_brute']:>9}"
+            f"{r['top1_accuracy_vs_gt']:>9}"
+        )
+
+    with open(BENCHMARK_JSON, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"Benchmark written → {BENCHMARK_JSON}")
+
+    return report
+
+
+if __name__ == "__main__":
+    # python -m data_pipeline.phase_D_fuzzy_canonical_mapping.benchmark_blocking
+    run_blocking_benchmark()
@@ -0,0 +1,205 @@
+# ======================================================
+# PHASE D — CHARACTER N-GRAM CANDIDATE INDEX
+# ======================================================
+# - Built ONCE over the master catalog names
+# - Inverted index: n-gram → catalog row ids
+# - Returns a bounded shortlist per query
+# - Only the shortlist is scored by RapidFuzz
+# ======================================================
+
+from collections import defaultdict
+from typing import Dict, List
+
+import numpy as np
+
+from .text_normalizer import normalize_for_matching
+from .fuzzy_matcher import compute_fuzzy_scores
+
+# ------------------------------------------------------
+# PARAMETERS (TUNABLE, NOT HARD-CODED)
+# ------------------------------------------------------
+
+NGRAM_SIZE = 3
+DEFAULT_SHORTLIST_SIZE = 25
+
+
+def char_ngrams(text: str, n: int = NGRAM_SIZE) -> set:
+    """
+    Padded character n-grams:
+      'DOLO 650' → {' DO', 'DOL', 'OLO', 'LO ', 'O 6', ...}
+    """
+    padded = f" {text} "
+
+    if len(padded) <= n:
+        return {padded}
+
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+class NGramCandidateIndex:
+    """
+    Inverted character n-gram index over CLEANED_MEDICINE_NAME.
+
+    Candidates are ranked by Dice overlap of their n-gram sets with the
+    query, which favours both short names contained in the query
+    (partial_ratio) and names sharing most tokens (token_set_ratio).
+    """
+
+    def __init__(self, names: List[str], n: int = NGRAM_SIZE):
+        self.n = n
+        self.names = list(names)
+
+        postings = defaultdict(list)
+        gram_counts = []
+
+        for row_id, name in enumerate(self.names):
+            grams = char_ngrams(name, n)
+            gram_counts.append(len(grams))
+            for gram in grams:
+                postings[gram].append(row_id)
+
+        self.postings = {
+            gram: np.asarray(ids, dtype=np.int32)
+            for gram, ids in postings.items()
+        }
+        self.gram_counts = np.asarray(gram_counts, dtype=np.float64)
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Flattened postings (CSR layout) for the compiled master snapshot.
+        """
+        grams = sorted(self.postings)
+        lengths = [len(self.postings[g]) for g in grams]
+
+        return {
+            "grams": np.asarray(grams, dtype=f"<U{self.n}"),
+            "offsets": np.concatenate(([0], np.cumsum(lengths))).astype(np.int64),
+            "row_ids": (
+                np.concatenate([self.postings[g] for g in grams])
+                if grams else np.zeros(0, dtype=np.int32)
+            ),
+            "gram_counts": self.gram_counts,
+        }
+
+    @classmethod
+    def from_arrays(cls, names: List[str], arrays: Dict[str, np.ndarray], n: int = NGRAM_SIZE):
+        """
+        Rebuilds the index from to_arrays() output without re-tokenizing.
+        """
+        index = cls.__new__(cls)
+        index.n = n
+        index.names = list(names)
+
+        offsets = arrays["offsets"]
+        row_ids = arrays["row_ids"]
+
+        index.postings = {
+            str(gram): row_ids[offsets[i]:offsets[i + 1]]
+            for i, gram in enumerate(arrays["grams"])
+        }
+        index.gram_counts = np.asarray(arrays["gram_counts"], dtype=np.float64)
+
+        return index
+
+    def shortlist(self, query: str, limit: int = DEFAULT_SHORTLIST_SIZE) -> List[int]:
+        """
+        Returns up to `limit` catalog row ids, in catalog order
+        (so RapidFuzz tie-breaking matches a full-catalog scan).
+        """
+        query_grams = char_ngrams(query, self.n)
+        hit_lists = [
+            self.postings[g] for g in query_grams if g in self.postings
+        ]
+
+        if not hit_lists:
+            return []
+
+        hits = np.bincount(
+            np.concatenate(hit_lists),
+            minlength=len(self.names)
+        )
+        row_ids = np.flatnonzero(hits)
+
+        if len(row_ids) > limit:
+            dice = 2.0 * hits[row_ids] / (
+                len(query_grams) + self.gram_counts[row_ids]
+            )
+            # Highest overlap first, lowest row id on ties
+            order = np.lexsort((row_ids, -dice))[:limit]
+            row_ids = np.sort(row_ids[order])
+
+        return row_ids.tolist()
+
+    def candidates(self, query: str, limit: int = DEFAULT_SHORTLIST_SIZE) -> List[str]:
+        """
+        Shortlisted candidate names. Falls back to the full catalog
+        when the query shares no n-gram with any master name.
+        """
+        row_ids = self.shortlist(query, limit)
+
+        if not row_ids:
+            return list(self.names)
+
+        return [self.names[i] for i in row_ids]
+
+
+def build_candidate_index(catalog, n: int = NGRAM_SIZE) -> NGramCandidateIndex:
+    return NGramCandidateIndex(catalog.names, n=n)
+
+
+# ------------------------------------------------------
+# RECALL CHECK (shortlist vs brute force)
+# ------------------------------------------------------
+
+def check_shortlist_recall(
+    phase_c_df,
+    catalog,
+    index: NGramCandidateIndex,
+    limit: int = DEFAULT_SHORTLIST_SIZE
+) -> Dict:
+    """
+    Confirms the shortlist always contains the brute-force winner.
+    A miss is any row whose best full-catalog match is absent from
+    the shortlist, or whose shortlisted best differs from it.
+    """
+    all_names = list(catalog.names)
+
+    checked = 0
+    shortlist_sizes = []
+    misses = []
+
+    for _, row in phase_c_df.iterrows():
+        norm_name = normalize_for_matching(row.get("raw_name", ""))
+        if not norm_name:
+            continue
+
+        brute = compute_fuzzy_scores(norm_name, all_names)[0]
+
+        shortlisted = index.candidates(norm_name, limit)
+        indexed = compute_fuzzy_scores(norm_name, shortlisted)[0]
+
+        checked += 1
+        shortlist_sizes.append(len(shortlisted))
+
+        if indexed != brute:
+            misses.append({
+                "file_name": row.get("file_name"),
+                "position": row.get("position"),
+                "raw_name": row.get("raw_name"),
+                "brute_force": brute,
+                "shortlist": indexed,
+            })
+
+    return {
+        "rows_checked": checked,
+        "catalog_size": len(all_names),
+        "shortlist_limit": limit,
+        "mean_shortlist_size": (
+            round(float(np.mean(shortlist_sizes)), 2)
+            if shortlist_sizes else 0.0
+        ),
+        "recall": (
+            round(1.0 - len(misses) / checked, 4) if checked else 1.0
+        ),
+        "misses": misses,
+    }
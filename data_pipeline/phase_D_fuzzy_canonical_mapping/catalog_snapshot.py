@@ -0,0 +1,176 @@
+# ======================================================
+# PHASE D — COMPILED MASTER CATALOG SNAPSHOT
+# ======================================================
+# - _master_sheet.xlsx is parsed (openpyxl) ONLY when it changes
+# - Snapshot directory is keyed by the xlsx SHA-256 content hash
+# - Columns stored as fixed-width .npy arrays (memory-mappable)
+# - Holds validated columns and the n-gram and phonetic
+#   blocking indexes
+# - Stale snapshots are removed when a new one is compiled
+# ======================================================
+
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .master_loader import load_master_table
+from .candidate_index import NGRAM_SIZE, NGramCandidateIndex
+from .master_catalog import MasterCatalog
+from .phonetic_index import PHONETIC_KEY_LEN, PhoneticBlockingIndex
+
+SNAPSHOT_FORMAT_VERSION = 3
+SNAPSHOT_PREFIX = "master_"
+
+CATALOG_COLUMNS = ["ITEM_CODE", "CLEANED_MEDICINE_NAME", "MEDICINE_TYPE"]
+INDEX_ARRAYS = ["grams", "offsets", "row_ids", "gram_counts"]
+PHONETIC_ARRAYS = ["keys", "offsets", "row_ids"]
+PHONETIC_PREFIX = "phonetic_"
+
+# ------------------------------------------------------
+# HELPERS
+# ------------------------------------------------------
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _to_fixed_width(values) -> np.ndarray:
+    """
+    Object column → fixed-width unicode array.
+    Missing cells are stored as "" and restored as None.
+    """
+    return np.asarray(
+        ["" if pd.isna(v) else str(v) for v in values],
+        dtype=str
+    )
+
+
+def _snapshot_dir(cache_dir: str, catalog_hash: str) -> str:
+    return os.path.join(cache_dir, f"{SNAPSHOT_PREFIX}{catalog_hash[:16]}")
+
+
+# ------------------------------------------------------
+# COMPILE
+# ------------------------------------------------------
+
+def compile_master_snapshot(xlsx_path: str, cache_dir: str, catalog_hash: str) -> str:
+    master_df = load_master_table(xlsx_path)
+
+    names = master_df["CLEANED_MEDICINE_NAME"].tolist()
+    index = NGramCandidateIndex(names, n=NGRAM_SIZE)
+
+    arrays = {col: _to_fixed_width(master_df[col]) for col in CATALOG_COLUMNS}
+    arrays.update(index.to_arrays())
+    arrays.update({
+        PHONETIC_PREFIX + key: arr
+        for key, arr in PhoneticBlockingIndex(names).to_arrays().items()
+    })
+
+    final_dir = _snapshot_dir(cache_dir, catalog_hash)
+    tmp_dir = final_dir + ".tmp"
+
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    for key, arr in arrays.items():
+        np.save(os.path.join(tmp_dir, f"{key}.npy"), arr, allow_pickle=False)
+
+    with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "format_version": SNAPSHOT_FORMAT_VERSION,
+                "source": os.path.basename(xlsx_path),
+                "catalog_hash": catalog_hash,
+                "rows": len(master_df),
+                "columns": CATALOG_COLUMNS,
+                "ngram_size": NGRAM_SIZE,
+                "phonetic_key_len": PHONETIC_KEY_LEN,
+                "compiled_at": datetime.now().isoformat(timespec="seconds"),
+            },
+            f,
+            indent=2
+        )
+
+    shutil.rmtree(final_dir, ignore_errors=True)
+    os.replace(tmp_dir, final_dir)
+
+    # Drop snapshots of older sheet versions
+    for entry in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, entry)
+        if entry.startswith(SNAPSHOT_PREFIX) and path != final_dir:
+            shutil.rmtree(path, ignore_errors=True)
+
+    print(f"Master snapshot compiled → {final_dir}")
+
+    return final_dir
+
+
+# ------------------------------------------------------
+# LOAD
+# ------------------------------------------------------
+
+def _is_valid_snapshot(snapshot_dir: str, catalog_hash: str) -> bool:
+    meta_path = os.path.join(snapshot_dir, "meta.json")
+    if not os.path.exists(meta_path):
+        return False
+
+    with open(meta_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+
+    return (
+        meta.get("format_version") == SNAPSHOT_FORMAT_VERSION
+        and meta.get("catalog_hash") == catalog_hash
+        and meta.get("ngram_size") == NGRAM_SIZE
+        and meta.get("phonetic_key_len") == PHONETIC_KEY_LEN
+    )
+
+
+def load_master_snapshot(xlsx_path: str, cache_dir: str) -> dict:
+    """
+    Returns the frozen master catalog snapshot:
+    - catalog_hash: SHA-256 of the xlsx content
+    - catalog: MasterCatalog over the validated columns
+    - candidate_index: prebuilt NGramCandidateIndex
+    - phonetic_index: prebuilt PhoneticBlockingIndex
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+
+    catalog_hash = file_sha256(xlsx_path)
+    snapshot_dir = _snapshot_dir(cache_dir, catalog_hash)
+
+    if not _is_valid_snapshot(snapshot_dir, catalog_hash):
+        compile_master_snapshot(xlsx_path, cache_dir, catalog_hash)
+
+    def _load(key):
+        return np.load(os.path.join(snapshot_dir, f"{key}.npy"), mmap_mode="r")
+
+    # ITEM_CODE / MEDICINE_TYPE stay memory-mapped (shared page cache)
+    catalog = MasterCatalog(
+        _load("CLEANED_MEDICINE_NAME").tolist(),
+        _load("ITEM_CODE"),
+        _load("MEDICINE_TYPE")
+    )
+
+    return {
+        "catalog_hash": catalog_hash,
+        "catalog": catalog,
+        "candidate_index": NGramCandidateIndex.from_arrays(
+            catalog.names,
+            {key: _load(key) for key in INDEX_ARRAYS},
+            n=NGRAM_SIZE
+        ),
+        "phonetic_index": PhoneticBlockingIndex.from_arrays(
+            catalog.names,
+            {key: _load(PHONETIC_PREFIX + key) for key in PHONETIC_ARRAYS},
+            key_len=PHONETIC_KEY_LEN
+        ),
+    }
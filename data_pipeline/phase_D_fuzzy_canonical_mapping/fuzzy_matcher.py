@@ -1,5 +1,13 @@
 from typing import List, Dict
-from rapidfuzz import fuzz
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+TOKEN_SET_WEIGHT = 0.60
+PARTIAL_WEIGHT = 0.40
+
+# Rows scored per cdist call (bounds the score matrix memory)
+BATCH_CHUNK_ROWS = 256
 
 
 def compute_fuzzy_scores(query: str, candidates: List[str]) -> List[Dict]:
@@ -9,7 +17,9 @@ def compute_fuzzy_scores(query: str, candidates: List[str]) -> List[Dict]:
         token_score = fuzz.token_set_ratio(query, cand)
         partial_score = fuzz.partial_ratio(query, cand)
 
-        final = round(0.60*token_score + 0.40*partial_score, 4)
+        final = round(
+            TOKEN_SET_WEIGHT*token_score + PARTIAL_WEIGHT*partial_score, 4
+        )
 
         results.append({
             "candidate": cand,
@@ -18,3 +28,89 @@ def compute_fuzzy_scores(query: str, candidates: List[str]) -> List[Dict]:
 
     results.sort(key=lambda x: x["score"], reverse=True)
     return results
+
+
+def compute_score_matrix(
+    queries: List[str],
+    candidates: List[str],
+    workers: int = -1
+) -> np.ndarray:
+    """
+    Combined (unrounded) token-set / partial score matrix,
+    shape (len(queries), len(candidates)), computed on all cores.
+    """
+    token_scores = process.cdist(
+        queries, candidates,
+        scorer=fuzz.token_set_ratio,
+        dtype=np.float64,
+        workers=workers
+    )
+    partial_scores = process.cdist(
+        queries, candidates,
+        scorer=fuzz.partial_ratio,
+        dtype=np.float64,
+        workers=workers
+    )
+
+    return TOKEN_SET_WEIGHT * token_scores + PARTIAL_WEIGHT * partial_scores
+
+
+def _top_k_from_scores(
+    scores: np.ndarray,
+    candidates: List[str],
+    top_k: int,
+    score_cutoff: float
+) -> List[Dict]:
+    """
+    Top-k of one score row, ordered exactly like compute_fuzzy_scores:
+    rounded score descending, catalog order on ties.
+    """
+    k = min(top_k, len(scores))
+    if k <= 0:
+        return []
+
+    kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+
+    # Rounding to 4 d.p. is monotonic, so nothing more than 1e-4 below
+    # the k-th raw score can round into the top-k
+    pool = np.flatnonzero(scores >= kth - 1e-4)
+
+    ranked = sorted(
+        ((round(float(scores[j]), 4), int(j)) for j in pool),
+        key=lambda x: (-x[0], x[1])
+    )
+
+    return [
+        {"candidate": candidates[j], "score": score}
+        for score, j in ranked[:k]
+        if score >= score_cutoff
+    ]
+
+
+def top_k_matches(
+    queries: List[str],
+    candidates: List[str],
+    top_k: int = 1,
+    score_cutoff: float = 0.0,
+    workers: int = -1
+) -> List[List[Dict]]:
+    """
+    Batch counterpart of compute_fuzzy_scores.
+    Returns, per query, at most top_k candidates scoring >= score_cutoff.
+    For top_k=1 the single entry equals compute_fuzzy_scores(q, c)[0].
+    """
+    if not candidates:
+        return [[] for _ in queries]
+
+    results = []
+
+    for start in range(0, len(queries), BATCH_CHUNK_ROWS):
+        chunk = queries[start:start + BATCH_CHUNK_ROWS]
+        matrix = compute_score_matrix(chunk, candidates, workers)
+
+        for scores in matrix:
+            results.append(
+                _top_k_from_scores(scores, candidates, top_k, score_cutoff)
+            )
+
+    return results
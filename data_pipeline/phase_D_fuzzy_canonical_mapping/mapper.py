@@ -1,34 +1,223 @@
+import time
+
 from .text_normalizer import normalize_for_matching
-from .fuzzy_matcher import compute_fuzzy_scores
+from .fuzzy_matcher import compute_fuzzy_scores, top_k_matches
+
+# In-partition best below this score is re-searched on the full catalog
+FORM_FALLBACK_THRESHOLD = 80.0
+
+
+def _build_result(row: dict, best: dict, catalog, source="FUZZY"):
+    best_row = catalog.resolve(best["candidate"])
+
+    return {
+        "FILE_NAME": row["file_name"],
+        "POSITION": row["position"],
+        "RAW_NAME": row.get("raw_name", ""),
+        "RAW_FORM": row["raw_form"],
+        "MAPPED_NAME": best_row["CLEANED_MEDICINE_NAME"],
+        "ITEM_CODE": best_row["ITEM_CODE"],
+        "MEDICINE_TYPE": best_row["MEDICINE_TYPE"],
+        "QUANTITY": row["raw_quantity"],  
+        "MATCH_SCORE": best["score"],
+        "SOURCE": source
+    }
 
 
-def map_row_to_master(row: dict, master_df):
+def map_row_to_master(row: dict, catalog, candidate_index=None,
+                      fallback_threshold=None):
+    """
+    Maps one Phase C row to the master catalog.
+    When a candidate_index (n-gram or phonetic) is given, only its
+    candidates are scored; with a fallback_threshold, a best candidate
+    scoring below it triggers a full-catalog search.
+    """
     raw_name = row.get("raw_name", "")
     norm_name = normalize_for_matching(raw_name)
 
     if not norm_name:
         return None
 
-    candidates = master_df["CLEANED_MEDICINE_NAME"].tolist()
+    if candidate_index is not None:
+        candidates = candidate_index.candidates(norm_name)
+    else:
+        candidates = catalog.names
     scores = compute_fuzzy_scores(norm_name, candidates)
 
+    if (
+        candidate_index is not None
+        and fallback_threshold is not None
+        and (not scores or scores[0]["score"] < fallback_threshold)
+    ):
+        scores = compute_fuzzy_scores(norm_name, catalog.names)
+
     if not scores:
         return None
 
-    best = scores[0]
-    best_row = master_df[
-        master_df["CLEANED_MEDICINE_NAME"] == best["candidate"]
-    ].iloc[0]
+    return _build_result(row, scores[0], catalog)
 
-    return {
-        "FILE_NAME": row["file_name"],
-        "POSITION": row["position"],
-        "RAW_NAME": raw_name,
-        "RAW_FORM": row["raw_form"],
-        "MAPPED_NAME": best_row["CLEANED_MEDICINE_NAME"],
-        "ITEM_CODE": best_row["ITEM_CODE"],
-        "MEDICINE_TYPE": best_row["MEDICINE_TYPE"],
-        "QUANTITY": row["raw_quantity"],  
-        "MATCH_SCORE": best["score"],
-        "SOURCE": "FUZZY"
+
+def map_rows_to_master(rows, catalog, score_cutoff=0.0, workers=-1):
+    """
+    Batch counterpart of map_row_to_master.
+    All normalized names are scored against the catalog as one
+    score matrix on `workers` cores (-1 = all).
+    Returns one result per row (None when unmapped), in input order.
+    """
+    norm_names = [
+        normalize_for_matching(row.get("raw_name", "")) for row in rows
+    ]
+    to_score = [i for i, name in enumerate(norm_names) if name]
+
+    matches = top_k_matches(
+        [norm_names[i] for i in to_score],
+        catalog.names,
+        top_k=1,
+        score_cutoff=score_cutoff,
+        workers=workers
+    )
+
+    results = [None] * len(rows)
+
+    for i, top in zip(to_score, matches):
+        if top:
+            results[i] = _build_result(rows[i], top[0], catalog)
+
+    return results
+
+
+def map_rows_by_form(
+    rows,
+    catalog,
+    fallback_threshold=FORM_FALLBACK_THRESHOLD,
+    score_cutoff=0.0,
+    workers=-1
+):
+    """
+    Form-aware batch mapping.
+    Each row is first scored against the catalog partition of its Phase C
+    raw_form; rows whose best in-partition score is below
+    fallback_threshold (or whose form has no partition) are scored
+    against the full catalog.
+
+    Returns (results, report) where report holds the fallback rate and
+    per-partition row counts and timings.
+    """
+    norm_names = [
+        normalize_for_matching(row.get("raw_name", "")) for row in rows
+    ]
+
+    by_form = {}
+    for i, name in enumerate(norm_names):
+        if name:
+            by_form.setdefault(rows[i].get("raw_form"), []).append(i)
+
+    results = [None] * len(rows)
+    fallback = []
+    partitions_report = {}
+
+    for raw_form, idxs in by_form.items():
+        part_ids = catalog.partition(raw_form)
+
+        if len(part_ids) == 0:
+            fallback.extend(idxs)
+            continue
+
+        started = time.perf_counter()
+
+        matches = top_k_matches(
+            [norm_names[i] for i in idxs],
+            [catalog.names[j] for j in part_ids],
+            top_k=1,
+            score_cutoff=score_cutoff,
+            workers=workers
+        )
+
+        form_fallbacks = 0
+        for i, top in zip(idxs, matches):
+            if top and top[0]["score"] >= fallback_threshold:
+                results[i] = _build_result(rows[i], top[0], catalog)
+            else:
+                fallback.append(i)
+                form_fallbacks += 1
+
+        partitions_report[str(raw_form)] = {
+            "rows": len(idxs),
+            "catalog_rows": int(len(part_ids)),
+            "fallbacks": form_fallbacks,
+            "seconds": round(time.perf_counter() - started, 4),
+        }
+
+    started = time.perf_counter()
+    fallback.sort()
+
+    matches = top_k_matches(
+        [norm_names[i] for i in fallback],
+        catalog.names,
+        top_k=1,
+        score_cutoff=score_cutoff,
+        workers=workers
+    )
+
+    for i, top in zip(fallback, matches):
+        if top:
+            results[i] = _build_result(rows[i], top[0], catalog)
+
+    scored = sum(len(idxs) for idxs in by_form.values())
+
+    report = {
+        "rows_scored": scored,
+        "fallback_threshold": fallback_threshold,
+        "fallback_rows": len(fallback),
+        "fallback_rate": round(len(fallback) / scored, 4) if scored else 0.0,
+        "fallback_seconds": round(time.perf_counter() - started, 4),
+        "partitions": partitions_report,
     }
+
+    return results, report
+
+
+def map_rows_by_retrieval(rows, catalog, retriever, top_k=None,
+                          score_cutoff=0.0):
+    """
+    Two-stage batch mapping: the retriever (TF-IDF) returns top_k
+    candidates for the whole batch in one sparse product, RapidFuzz
+    re-ranks them per row. Rows sharing no n-gram with the catalog are
+    scored against the full catalog in one batched cdist.
+    Returns one result per row (None when unmapped), in input order.
+    """
+    norm_names = [
+        normalize_for_matching(row.get("raw_name", "")) for row in rows
+    ]
+    to_score = [i for i, name in enumerate(norm_names) if name]
+
+    queries = [norm_names[i] for i in to_score]
+    if top_k is None:
+        row_id_lists = retriever.top_k(queries)
+    else:
+        row_id_lists = retriever.top_k(queries, top_k)
+
+    results = [None] * len(rows)
+    unmatched = []
+
+    for i, row_ids in zip(to_score, row_id_lists):
+        if not row_ids:
+            unmatched.append(i)
+            continue
+
+        candidates = [retriever.names[j] for j in row_ids]
+        scores = compute_fuzzy_scores(norm_names[i], candidates)
+
+        if scores and scores[0]["score"] >= score_cutoff:
+            results[i] = _build_result(rows[i], scores[0], catalog)
+
+    if unmatched:
+        best = top_k_matches(
+            [norm_names[i] for i in unmatched], catalog.names,
+            top_k=1, score_cutoff=score_cutoff
+        )
+        for i, matches in zip(unmatched, best):
+            if matches:
+                results[i] = _build_result(rows[i], matches[0], catalog)
+
+    return results
@@ -0,0 +1,124 @@
+# ======================================================
+# PHASE D — ARRAY-BACKED MASTER CATALOG
+# ======================================================
+# - Interned CLEANED_MEDICINE_NAME strings
+# - Integer row ids (catalog order = master sheet order)
+# - Parallel arrays for ITEM_CODE and MEDICINE_TYPE
+# - name → row id dict index (first occurrence wins,
+#   same as the former boolean-mask .iloc[0] lookup)
+# - MEDICINE_TYPE partitions keyed by Phase C canonical form
+# ======================================================
+
+import sys
+from typing import Dict, List
+
+import numpy as np
+
+# ------------------------------------------------------
+# MASTER MEDICINE_TYPE → PHASE C CANONICAL FORM
+# ------------------------------------------------------
+# Master sheet spellings that differ from alias_registry canon
+
+FORM_SYNONYMS = {
+    "INJUCTION": "INJECTION",
+    "KID TABLET": "TABLET",
+}
+
+
+def canonical_form(value) -> str:
+    """
+    'SHAMPOO '         → 'SHAMPOO'
+    'ANTIBIOTIC_DROPS' → 'ANTIBIOTIC DROPS'
+    'INJUCTION'        → 'INJECTION'
+    """
+    if not isinstance(value, str):
+        return ""
+
+    form = " ".join(value.replace("_", " ").upper().split())
+    return FORM_SYNONYMS.get(form, form)
+
+
+class MasterCatalog:
+    """
+    Compact, read-only view of the master sheet used by Phase D.
+    Replaces the full pandas frame so that candidate resolution is O(1)
+    and workers only hold the three validated columns.
+    """
+
+    __slots__ = (
+        "names",
+        "item_codes",
+        "medicine_types",
+        "row_of",
+        "partitions",
+    )
+
+    def __init__(self, names: List[str], item_codes, medicine_types):
+        if not (len(names) == len(item_codes) == len(medicine_types)):
+            raise ValueError("MasterCatalog columns must have equal length")
+
+        self.names = tuple(sys.intern(str(n)) for n in names)
+
+        # Parallel arrays (may be memory-mapped snapshot columns)
+        self.item_codes = np.asarray(item_codes)
+        self.medicine_types = np.asarray(medicine_types)
+
+        self.row_of: Dict[str, int] = {}
+        for row_id, name in enumerate(self.names):
+            self.row_of.setdefault(name, row_id)
+
+        partitions: Dict[str, List[int]] = {}
+        for row_id in range(len(self.names)):
+            form = canonical_form(self.medicine_type(row_id))
+            if form:
+                partitions.setdefault(form, []).append(row_id)
+
+        self.partitions = {
+            form: np.asarray(ids, dtype=np.int32)
+            for form, ids in partitions.items()
+        }
+
+    @classmethod
+    def from_frame(cls, master_df):
+        return cls(
+            master_df["CLEANED_MEDICINE_NAME"].tolist(),
+            master_df["ITEM_CODE"].to_numpy(dtype=object),
+            master_df["MEDICINE_TYPE"].to_numpy(dtype=object)
+        )
+
+    def __len__(self):
+        return len(self.names)
+
+    @staticmethod
+    def _cell(value):
+        # Snapshot columns are fixed-width strings; "" marks a missing cell
+        if isinstance(value, np.str_):
+            return str(value) or None
+        return value
+
+    def item_code(self, row_id: int):
+        return self._cell(self.item_codes[row_id])
+
+    def medicine_type(self, row_id: int):
+        return self._cell(self.medicine_types[row_id])
+
+    def partition(self, raw_form) -> np.ndarray:
+        """
+        Row ids (catalog order) whose MEDICINE_TYPE matches a Phase C
+        raw_form; empty when the form has no partition.
+        """
+        return self.partitions.get(
+            canonical_form(raw_form), np.zeros(0, dtype=np.int32)
+        )
+
+    def resolve(self, name: str) -> Dict:
+        """
+        Constant-time lookup of a candidate name's catalog row.
+        """
+        row_id = self.row_of[name]
+
+        return {
+            "CLEANED_MEDICINE_NAME": self.names[row_id],
+            "ITEM_CODE": self.item_code(row_id),
+            "MEDICINE_TYPE": self.medicine_type(row_id),
+        }
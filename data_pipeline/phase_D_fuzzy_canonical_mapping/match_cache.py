@@ -0,0 +1,398 @@
+# ======================================================
+# PHASE D — EXACT-HIT MATCH CACHE & CORRECTION DICTIONARY
+# ======================================================
+# Tier 0 in front of fuzzy matching, keyed by the
+# normalize_for_matching(raw_name) output:
+#
+#   1. corrections : human-confirmed mappings imported from
+#                    the Phase E failure audit (SOURCE = CORRECTION),
+#                    per (name, canonical raw_form): the same spoken
+#                    name in another form is not overridden
+#   2. decisions   : memoised fuzzy winners (SOURCE = FUZZY)
+#
+# - In-process LRU in front of a persistent SQLite store
+# - Every entry records source, timestamp and catalog hash
+# - Entries compiled against another master snapshot are
+#   never served; stale fuzzy decisions are purged on open,
+#   stale corrections are kept for the audit trail (as are the
+#   former form-agnostic ones, in corrections_unscoped)
+# - A correction conflicting with a stored one is rejected
+# ======================================================
+
+import os
+import sqlite3
+from collections import OrderedDict
+from datetime import datetime
+
+import pandas as pd
+
+from .text_normalizer import normalize_for_matching
+from .fuzzy_matcher import compute_fuzzy_scores
+from .mapper import _build_result
+from .master_catalog import canonical_form
+
+DEFAULT_LRU_SIZE = 4096
+
+# Decision scope of a search over the whole catalog; prefixed with
+# the backend (backend_scope): shortlist backends (ngram / phonetic /
+# tfidf) can miss the full-catalog winner, so no backend is served
+# another backend's decisions
+FULL_CATALOG_SCOPE = "ALL"
+
+_MISS = object()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS corrections (
+    norm_name     TEXT NOT NULL,
+    form          TEXT NOT NULL,
+    mapped_name   TEXT NOT NULL,
+    score         REAL,
+    source        TEXT NOT NULL,
+    catalog_hash  TEXT NOT NULL,
+    created_at    TEXT NOT NULL,
+    evidence      TEXT,
+    PRIMARY KEY (norm_name, form, catalog_hash)
+);
+CREATE TABLE IF NOT EXISTS decisions (
+    norm_name     TEXT NOT NULL,
+    scope         TEXT NOT NULL,
+    mapped_name   TEXT NOT NULL,
+    score         REAL,
+    source        TEXT NOT NULL,
+    catalog_hash  TEXT NOT NULL,
+    created_at    TEXT NOT NULL,
+    PRIMARY KEY (norm_name, scope)
+);
+"""
+
+
+def backend_scope(backend: str, **shortlist_params) -> str:
+    """
+    Decision scope of a Phase D backend, with the shortlist
+    parameters its winners depend on (e.g. top_k=25).
+    """
+    params = "".join(
+        f";{name}={value}" for name, value in sorted(shortlist_params.items())
+    )
+    return f"{backend}:{FULL_CATALOG_SCOPE}{params}"
+
+
+def form_scope(form: str, fallback_threshold: float) -> str:
+    """
+    Decision scope of form-aware mapping: the winner depends on the
+    partition searched and on the fallback threshold.
+    """
+    return f"FORM:{form}@{fallback_threshold}"
+
+
+class MatchCache:
+    """
+    Persistent exact-hit cache for one master snapshot (catalog_hash).
+    """
+
+    def __init__(self, db_path: str, catalog_hash: str, maxsize: int = DEFAULT_LRU_SIZE):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+
+        self.db_path = db_path
+        self.catalog_hash = catalog_hash
+        self.maxsize = maxsize
+
+        self._lru = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        self._conn = sqlite3.connect(db_path)
+        self._migrate()
+        self._conn.executescript(_SCHEMA)
+
+        # Master snapshot changed → memoised fuzzy winners are invalid
+        purged = self._conn.execute(
+            "DELETE FROM decisions WHERE catalog_hash != ?",
+            (catalog_hash,)
+        ).rowcount
+        self._conn.commit()
+
+        if purged:
+            print(f"Match cache: purged {purged} decisions of an older master snapshot")
+
+    def _migrate(self):
+        # Corrections keyed by name only (before raw_form scoping) are
+        # not served any more; kept for the audit trail
+        columns = {
+            row[1] for row in self._conn.execute("PRAGMA table_info(corrections)")
+        }
+
+        if columns and "form" not in columns:
+            with self._conn:
+                self._conn.execute(
+                    "ALTER TABLE corrections RENAME TO corrections_unscoped"
+                )
+            print("Match cache: form-agnostic corrections moved to corrections_unscoped")
+
+    # --------------------------------------------------
+    # LOOKUP
+    # --------------------------------------------------
+
+    def _fetch(self, norm_name: str, scope: str, form: str):
+        row = self._conn.execute(
+            "SELECT mapped_name, score, source, catalog_hash, created_at "
+            "FROM corrections WHERE norm_name = ? AND form = ? AND catalog_hash = ?",
+            (norm_name, form, self.catalog_hash)
+        ).fetchone()
+
+        if row is None:
+            row = self._conn.execute(
+                "SELECT mapped_name, score, source, catalog_hash, created_at "
+                "FROM decisions WHERE norm_name = ? AND scope = ? "
+                "AND catalog_hash = ?",
+                (norm_name, scope, self.catalog_hash)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return dict(zip(
+            ("mapped_name", "score", "source", "catalog_hash", "created_at"),
+            row
+        ))
+
+    def lookup(self, norm_name: str, scope: str = FULL_CATALOG_SCOPE, form: str = ""):
+        """
+        form: canonical_form(raw_form) of the row (correction key).
+        """
+        key = (norm_name, scope, form)
+
+        entry = self._lru.get(key, _MISS)
+        if entry is _MISS:
+            entry = self._fetch(norm_name, scope, form)
+            self._remember(key, entry)
+        else:
+            self._lru.move_to_end(key)
+
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        return entry
+
+    def _remember(self, key, entry):
+        self._lru[key] = entry
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.maxsize:
+            self._lru.popitem(last=False)
+
+    # --------------------------------------------------
+    # WRITE
+    # --------------------------------------------------
+
+    def record(self, norm_name: str, mapped_name: str, score: float,
+               scope: str = FULL_CATALOG_SCOPE, source: str = "FUZZY"):
+        created_at = datetime.now().isoformat(timespec="seconds")
+
+        self._conn.execute(
+            "INSERT OR REPLACE INTO decisions "
+            "(norm_name, scope, mapped_name, score, source, catalog_hash, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (norm_name, scope, mapped_name, score, source,
+             self.catalog_hash, created_at)
+        )
+
+        for key in [k for k in self._lru if k[:2] == (norm_name, scope)]:
+            del self._lru[key]
+
+    def add_correction(self, norm_name: str, form: str, mapped_name: str, score: float,
+                       evidence: str = "", source: str = "CORRECTION"):
+        """
+        Returns "added", "exists" (same mapping already stored) or
+        "conflict" (another mapping stored for (norm_name, form); kept).
+        """
+        stored = self._conn.execute(
+            "SELECT mapped_name FROM corrections "
+            "WHERE norm_name = ? AND form = ? AND catalog_hash = ?",
+            (norm_name, form, self.catalog_hash)
+        ).fetchone()
+
+        if stored is not None:
+            return "exists" if stored[0] == mapped_name else "conflict"
+
+        created_at = datetime.now().isoformat(timespec="seconds")
+
+        self._conn.execute(
+            "INSERT INTO corrections "
+            "(norm_name, form, mapped_name, score, source, catalog_hash, created_at, evidence) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (norm_name, form, mapped_name, score, source,
+             self.catalog_hash, created_at, evidence)
+        )
+
+        # A correction overrides any memoised decision for this name / form
+        for key in [k for k in self._lru if k[0] == norm_name and k[2] == form]:
+            del self._lru[key]
+
+        return "added"
+
+    def commit(self):
+        self._conn.commit()
+
+    def close(self):
+        self._conn.commit()
+        self._conn.close()
+
+
+# ------------------------------------------------------
+# CACHE-FRONTED MAPPING
+# ------------------------------------------------------
+
+def map_rows_with_cache(rows, catalog, cache: MatchCache, map_rows,
+                        scope_of=None, score_cutoff=0.0):
+    """
+    Resolves rows from the cache first and sends only the remaining,
+    de-duplicated names to `map_rows` (any batch mapper returning one
+    result per row). New fuzzy winners are recorded in the cache.
+
+    scope_of(row) → decision scope (FULL_CATALOG_SCOPE when omitted;
+    run_phase_D passes backend_scope / form_scope).
+    """
+    results = [None] * len(rows)
+    pending = {}
+
+    for i, row in enumerate(rows):
+        norm_name = normalize_for_matching(row.get("raw_name", ""))
+        if not norm_name:
+            continue
+
+        scope = scope_of(row) if scope_of else FULL_CATALOG_SCOPE
+        form = canonical_form(row.get("raw_form"))
+        entry = cache.lookup(norm_name, scope, form)
+
+        if (
+            entry is not None
+            and entry["mapped_name"] in catalog.row_of
+            and (entry["score"] is None or entry["score"] >= score_cutoff)
+        ):
+            results[i] = _build_result(
+                row,
+                {"candidate": entry["mapped_name"], "score": entry["score"]},
+                catalog,
+                source=entry["source"]
+            )
+        else:
+            pending.setdefault((norm_name, scope, form), []).append(i)
+
+    # Score each distinct (name, scope, form) once: rows of a form with
+    # a correction must not take the fuzzy winner of another form
+    keys = list(pending)
+    first_rows = [rows[pending[key][0]] for key in keys]
+
+    for key, result in zip(keys, map_rows(first_rows) if first_rows else []):
+        if result is None:
+            continue
+
+        norm_name, scope, _ = key
+        cache.record(norm_name, result["MAPPED_NAME"], result["MATCH_SCORE"], scope)
+
+        best = {"candidate": result["MAPPED_NAME"], "score": result["MATCH_SCORE"]}
+        for i in pending[key]:
+            results[i] = _build_result(rows[i], best, catalog)
+
+    cache.commit()
+
+    return results
+
+
+# ------------------------------------------------------
+# CORRECTIONS FROM THE PHASE E FAILURE AUDIT
+# ------------------------------------------------------
+
+def _is_confirmed(value) -> bool:
+    """
+    CONFIRMED cell → bool; only true / yes / 1 approve a row.
+    """
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip().lower() in {"true", "yes", "y", "1"}
+
+
+def import_failure_audit(cache: MatchCache, failure_audit_csv: str,
+                         phase_d_csv: str, catalog) -> int:
+    """
+    Loads human-confirmed corrections (GT_NAME) from failure_audit.csv.
+    ROW_INDEX aligns with the Phase D predictions Phase E evaluated,
+    which supply the RAW_NAME / RAW_FORM the correction is keyed by.
+    An optional CONFIRMED column (true / yes / 1) restricts the import
+    to approved rows. Conflicting GT names for the same key are
+    reported, not imported: within the audit, against a stored
+    correction, or against evaluated rows absent from the audit
+    (Phase E found their MAPPED_NAME correct).
+    """
+    audit_df = pd.read_csv(failure_audit_csv)
+    pred_df = pd.read_csv(phase_d_csv)
+
+    audited_rows = set(audit_df["ROW_INDEX"].astype(int))
+
+    if "CONFIRMED" in audit_df.columns:
+        audit_df = audit_df[audit_df["CONFIRMED"].map(_is_confirmed)]
+
+    # (norm_name, form) → {gt_name: first ROW_INDEX}
+    proposed = {}
+
+    for _, row in audit_df.iterrows():
+        row_index = int(row["ROW_INDEX"])
+        gt_name = str(row["GT_NAME"]).strip().upper()
+
+        if row_index >= len(pred_df) or gt_name not in catalog.row_of:
+            print(f"Skipping correction for ROW_INDEX {row_index}: {gt_name}")
+            continue
+
+        raw_name = pred_df.loc[row_index, "RAW_NAME"]
+        norm_name = (
+            normalize_for_matching(raw_name) if isinstance(raw_name, str) else ""
+        )
+        if not norm_name:
+            continue
+
+        form = canonical_form(pred_df.loc[row_index, "RAW_FORM"])
+        proposed.setdefault((norm_name, form), {}).setdefault(gt_name, row_index)
+
+    # Rows Phase E found correct confirm their own mapping for the key
+    for row_index, row in pred_df.iterrows():
+        if row_index in audited_rows or not isinstance(row["RAW_NAME"], str):
+            continue
+
+        key = (normalize_for_matching(row["RAW_NAME"]), canonical_form(row["RAW_FORM"]))
+        if key in proposed:
+            proposed[key].setdefault(str(row["MAPPED_NAME"]).strip().upper(), row_index)
+
+    imported = 0
+
+    for (norm_name, form), gt_names in proposed.items():
+        if len(gt_names) > 1:
+            print(
+                f"Conflicting corrections for {norm_name!r} [{form or '-'}], "
+                f"not imported: "
+                + ", ".join(f"{gt} (ROW_INDEX {i})" for gt, i in gt_names.items())
+            )
+            continue
+
+        (gt_name, row_index), = gt_names.items()
+
+        status = cache.add_correction(
+            norm_name,
+            form,
+            gt_name,
+            compute_fuzzy_scores(norm_name, [gt_name])[0]["score"],
+            evidence=f"{os.path.basename(failure_audit_csv)}:ROW_INDEX={row_index}"
+        )
+
+        if status == "conflict":
+            print(
+                f"Correction for {norm_name!r} [{form or '-'}] → {gt_name} "
+                f"(ROW_INDEX {row_index}) conflicts with the stored one, not imported"
+            )
+        elif status == "added":
+            imported += 1
+
+    cache.commit()
+
+    return imported
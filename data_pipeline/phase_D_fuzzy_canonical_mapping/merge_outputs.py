@@ -5,9 +5,14 @@
 # - Preserves QUANTITY correctly
 # - Sorts FILE_NAME numerically (1.wav, 2.wav, 10.wav)
 # - Sorts POSITION within each FILE_NAME
+# - Streaming mode: chunked reads + k-way heap merge on
+#   (file number, POSITION), incremental writes; inputs it
+#   cannot stream (not POSITION-ordered, differing columns)
+#   fall back to the in-memory sort
 # ======================================================
 
 import os
+import heapq
 import pandas as pd
 from pathlib import Path
 
@@ -22,6 +27,23 @@ OUTPUT_CSV = os.path.join(
     "fuzzy_canonical_merged.csv"
 )
 
+# Rows read per chunk (per open file) / written per flush in
+# streaming mode; resident rows ≈ files × MERGE_CHUNK_ROWS + MERGE_WRITE_ROWS
+MERGE_CHUNK_ROWS = 1_000
+MERGE_WRITE_ROWS = 10_000
+
+FUZZY_DTYPES = {
+    "FILE_NAME": str,
+    "POSITION": "Int64",
+    "RAW_NAME": str,
+    "MAPPED_NAME": str,
+    "ITEM_CODE": str,
+    "MEDICINE_TYPE": str,
+    "QUANTITY": str,      # 
+    "MATCH_SCORE": float,
+    "SOURCE": str,
+}
+
 # --------------------------------------------------
 # HELPERS
 # --------------------------------------------------
@@ -37,49 +59,79 @@ def extract_file_number(file_name: str) -> int:
         return 10**9  # push bad filenames to bottom
 
 
+def normalize_quantity(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normalize QUANTITY (avoid NaN / dtype corruption)
+    """
+    df["QUANTITY"] = (
+        df["QUANTITY"]
+        .astype(str)
+        .str.strip()
+        .replace({"nan": ""})
+    )
+    return df
+
+
+def _sort_keys(chunk: pd.DataFrame):
+    """
+    (file number, POSITION) per row, missing POSITION last,
+    as DataFrame.sort_values orders them.
+    """
+    missing = chunk["POSITION"].isna()
+
+    return zip(
+        chunk["FILE_NAME"].map(extract_file_number).tolist(),
+        missing.tolist(),
+        chunk["POSITION"].fillna(0).astype("int64").tolist()
+    )
+
+
 # --------------------------------------------------
 # MERGE LOGIC
 # --------------------------------------------------
 
-def merge_fuzzy_csvs():
+class _NotStreamable(ValueError):
+    """
+    Per-audio CSVs the k-way merge cannot take as they are.
+    """
+
+
+def merge_fuzzy_csvs(streaming=True):
+    """
+    streaming=True : bounded-memory k-way merge (per-audio CSVs
+                     ordered by POSITION, as Phase D writes them);
+                     other inputs fall back to streaming=False
+    streaming=False: load all, concat, global sort
+    """
     csv_files = sorted(Path(FUZZY_DIR).glob("*_fuzzy.csv"))
 
     if not csv_files:
         raise RuntimeError(" No fuzzy CSV files found to merge")
 
+    if streaming:
+        try:
+            return _merge_streaming(csv_files)
+        except _NotStreamable as e:
+            if os.path.exists(OUTPUT_CSV + ".tmp"):
+                os.remove(OUTPUT_CSV + ".tmp")
+            print(f"⚠ Streaming merge not possible ({e}); sorting in memory")
+
+    return _merge_in_memory(csv_files)
+
+
+def _merge_in_memory(csv_files):
     dfs = []
 
     for file in csv_files:
         print(f"Reading {file.name}")
 
-        df = pd.read_csv(
-            file,
-            dtype={
-                "FILE_NAME": str,
-                "POSITION": "Int64",
-                "RAW_NAME": str,
-                "MAPPED_NAME": str,
-                "ITEM_CODE": str,
-                "MEDICINE_TYPE": str,
-                "QUANTITY": str,      # 
-                "MATCH_SCORE": float,
-                "SOURCE": str,
-            }
-        )
+        df = pd.read_csv(file, dtype=FUZZY_DTYPES)
 
         if df.empty:
             print(f"⚠ Skipping empty file: {file.name}")
             continue
 
-        # Normalize QUANTITY (avoid NaN / dtype corruption)
-        df["QUANTITY"] = (
-            df["QUANTITY"]
-            .astype(str)
-            .str.strip()
-            .replace({"nan": ""})
-        )
-
-        dfs.append(df)
+        dfs.append(normalize_quantity(df))
 
     if not dfs:
         raise RuntimeError("All fuzzy CSV files were empty")
@@ -114,6 +166,82 @@ def merge_fuzzy_csvs():
     print(f"Total rows: {len(merged_df)}")
 
 
+# --------------------------------------------------
+# STREAMING K-WAY MERGE
+# --------------------------------------------------
+
+def _iter_sorted_rows(file: Path, columns, chunksize: int):
+    """
+    Yields (sort key, row tuple) of one per-audio CSV, chunk by chunk.
+    """
+    last_key = None
+
+    for chunk in pd.read_csv(file, dtype=FUZZY_DTYPES, chunksize=chunksize):
+        if list(chunk.columns) != columns:
+            raise _NotStreamable(
+                f"{file.name}: columns {list(chunk.columns)} differ from {columns}"
+            )
+
+        normalize_quantity(chunk)
+
+        records = chunk.itertuples(index=False, name=None)
+
+        for key, record in zip(_sort_keys(chunk), records):
+            if last_key is not None and key < last_key:
+                raise _NotStreamable(f"{file.name} is not ordered by POSITION")
+            last_key = key
+
+            yield key, record
+
+
+def _merge_streaming(csv_files, chunksize=MERGE_CHUNK_ROWS,
+                     write_rows=MERGE_WRITE_ROWS):
+    columns = list(pd.read_csv(csv_files[0], nrows=0).columns)
+
+    if columns[:2] != ["FILE_NAME", "POSITION"]:
+        raise _NotStreamable(f"Unexpected fuzzy CSV columns: {columns}")
+
+    streams = []
+    for file in csv_files:
+        print(f"Reading {file.name}")
+        streams.append(_iter_sorted_rows(file, columns, chunksize))
+
+    # heapq.merge is stable: equal keys keep file order, then row order
+    merged = heapq.merge(*streams, key=lambda item: item[0])
+
+    tmp_csv = OUTPUT_CSV + ".tmp"
+    total = 0
+    buffer = []
+
+    def flush():
+        pd.DataFrame(buffer, columns=columns).to_csv(
+            tmp_csv,
+            mode="w" if total == len(buffer) else "a",
+            header=total == len(buffer),
+            index=False
+        )
+        buffer.clear()
+
+    for _, record in merged:
+        buffer.append(record)
+        total += 1
+
+        if len(buffer) >= write_rows:
+            flush()
+
+    if buffer:
+        flush()
+
+    if not total:
+        raise RuntimeError("All fuzzy CSV files were empty")
+
+    os.replace(tmp_csv, OUTPUT_CSV)
+
+    print("\nFUZZY MERGED CSV CREATED")
+    print(f"{OUTPUT_CSV}")
+    print(f"Total rows: {total}")
+
+
 # --------------------------------------------------
 # ENTRY POINT
 # --------------------------------------------------
@@ -0,0 +1,176 @@
+# ======================================================
+# PHASE D — PHONETIC BLOCKING INDEX
+# ======================================================
+# Cheap first-stage blocker for ASR (Whisper) misspellings:
+#   NFLAME  ~ ANAFLAM     (dropped leading vowel)
+#   ANZIT   ~ ANXIT       (Z / X / S merge)
+#   ANIPET  ~ ANEPT       (vowel drift)
+#
+# Each alphabetic token gets a Metaphone-style consonant key
+# tuned for Indian-English brand names; catalog rows sharing
+# any token key with the query form its candidate block.
+# ======================================================
+
+import re
+from collections import defaultdict
+from typing import Dict, List
+
+import numpy as np
+
+# ------------------------------------------------------
+# PARAMETERS (TUNABLE, NOT HARD-CODED)
+# ------------------------------------------------------
+
+PHONETIC_KEY_LEN = 4
+MIN_TOKEN_LEN = 2
+
+# In-block best below this score is re-searched on the full catalog
+BLOCK_FALLBACK_THRESHOLD = 80.0
+
+# Applied in order, before single-letter rules
+_DIGRAPHS = (
+    ("PH", "F"),
+    ("TH", "T"),
+    ("DH", "D"),
+    ("BH", "B"),
+    ("KH", "K"),
+    ("GH", "G"),
+    ("SH", "S"),
+    ("CH", "S"),   # SACHET heard as SEARCHEST / SOCHETS
+    ("CK", "K"),
+)
+
+_SOFT_C = re.compile(r"C(?=[EIY])")
+
+_LETTERS = str.maketrans({
+    "C": "K",
+    "Q": "K",
+    "X": "S",      # ANXIT ~ ANZIT
+    "Z": "S",
+    "W": "V",      # V / W interchange
+    "J": "G",
+})
+
+_SILENT = set("AEIOUYH")
+
+
+def phonetic_key(token: str, key_len: int = PHONETIC_KEY_LEN) -> str:
+    """
+    Consonant skeleton of an alphabetic token:
+      ANAFLAM → NFLM, NFLAME → NFLM, ANZIT → NST, ANXIT → NST
+    Vowels are dropped everywhere, including the leading one that
+    Whisper often loses.
+    """
+    token = re.sub(r"[^A-Z]", "", token.upper())
+
+    for src, dst in _DIGRAPHS:
+        token = token.replace(src, dst)
+
+    token = _SOFT_C.sub("S", token).translate(_LETTERS)
+
+    key = []
+    for ch in token:
+        if ch in _SILENT:
+            continue
+        if key and key[-1] == ch:
+            continue
+        key.append(ch)
+
+    return "".join(key[:key_len])
+
+
+def token_keys(text: str, key_len: int = PHONETIC_KEY_LEN) -> set:
+    """
+    Phonetic keys of the alphabetic tokens of a name.
+    Numeric / strength tokens (650, 12.5) do not block.
+    """
+    keys = set()
+
+    for tok in text.split():
+        if len(tok) < MIN_TOKEN_LEN or not tok.isalpha():
+            continue
+        key = phonetic_key(tok, key_len)
+        if key:
+            keys.add(key)
+
+    return keys
+
+
+class PhoneticBlockingIndex:
+    """
+    Inverted index: phonetic token key → catalog row ids.
+    """
+
+    def __init__(self, names: List[str], key_len: int = PHONETIC_KEY_LEN):
+        self.key_len = key_len
+        self.names = list(names)
+
+        postings = defaultdict(list)
+        for row_id, name in enumerate(self.names):
+            for key in token_keys(name, key_len):
+                postings[key].append(row_id)
+
+        self.postings = {
+            key: np.asarray(ids, dtype=np.int32)
+            for key, ids in postings.items()
+        }
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Flattened postings (CSR layout) for the compiled master snapshot.
+        """
+        keys = sorted(self.postings)
+        lengths = [len(self.postings[k]) for k in keys]
+
+        return {
+            "keys": np.asarray(keys, dtype=f"<U{self.key_len}"),
+            "offsets": np.concatenate(([0], np.cumsum(lengths))).astype(np.int64),
+            "row_ids": (
+                np.concatenate([self.postings[k] for k in keys])
+                if keys else np.zeros(0, dtype=np.int32)
+            ),
+        }
+
+    @classmethod
+    def from_arrays(cls, names: List[str], arrays: Dict[str, np.ndarray],
+                    key_len: int = PHONETIC_KEY_LEN):
+        index = cls.__new__(cls)
+        index.key_len = key_len
+        index.names = list(names)
+
+        offsets = arrays["offsets"]
+        row_ids = arrays["row_ids"]
+
+        index.postings = {
+            str(key): row_ids[offsets[i]:offsets[i + 1]]
+            for i, key in enumerate(arrays["keys"])
+        }
+
+        return index
+
+    def shortlist(self, query: str) -> List[int]:
+        """
+        Row ids (catalog order) sharing a phonetic token key with the query.
+        """
+        hit_lists = [
+            self.postings[k]
+            for k in token_keys(query, self.key_len)
+            if k in self.postings
+        ]
+
+        if not hit_lists:
+            return []
+
+        return np.unique(np.concatenate(hit_lists)).tolist()
+
+    def candidates(self, query: str) -> List[str]:
+        """
+        Blocked candidate names. Falls back to the full catalog when
+        no token of the query shares a phonetic key with the catalog.
+        """
+        row_ids = self.shortlist(query)
+
+        if not row_ids:
+            return list(self.names)
+
+        return [self.names[i] for i in row_ids]
@@ -0,0 +1,166 @@
+# ======================================================
+# PHASE D — ROW-LEVEL INCREMENTAL RESULT STORE
+# ======================================================
+# Keyed by the Phase C row content
+#   (file_name, position, raw_name, raw_form, raw_quantity)
+# plus the master catalog hash and the mapping configuration
+# (backend, form-aware threshold, score cutoff, ...).
+#
+# - A rerun maps only rows whose key is not in the store
+# - Stored results are spliced back in Phase C row order,
+#   so phase_D_fuzzy_all.csv is byte-identical to a full run
+# - Unmapped rows are stored too (result = null)
+# - Keys of rows no longer present in Phase C are pruned
+# ======================================================
+
+import os
+import json
+import sqlite3
+
+import numpy as np
+
+KEY_COLUMNS = ("file_name", "position", "raw_name", "raw_form", "raw_quantity")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    row_key       TEXT NOT NULL,
+    config        TEXT NOT NULL,
+    catalog_hash  TEXT NOT NULL,
+    result        TEXT,
+    PRIMARY KEY (row_key, config, catalog_hash)
+);
+"""
+
+
+def _plain(value):
+    """
+    numpy scalars → Python scalars (JSON-serialisable, same CSV text).
+    """
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def row_key(row: dict) -> str:
+    return json.dumps([_plain(row.get(col)) for col in KEY_COLUMNS])
+
+
+class ResultStore:
+    """
+    Persistent Phase D results for one master snapshot (catalog_hash)
+    and one mapping configuration.
+    """
+
+    def __init__(self, db_path: str, catalog_hash: str, config: str):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+
+        self.catalog_hash = catalog_hash
+        self.config = config
+
+        self._conn = sqlite3.connect(db_path)
+        self._conn.executescript(_SCHEMA)
+
+        # Master snapshot changed → every stored mapping is invalid
+        self._conn.execute(
+            "DELETE FROM results WHERE catalog_hash != ?",
+            (catalog_hash,)
+        )
+        self._conn.commit()
+
+    def load(self) -> dict:
+        """
+        row_key → stored result (dict, or None for an unmapped row).
+        """
+        cursor = self._conn.execute(
+            "SELECT row_key, result FROM results "
+            "WHERE config = ? AND catalog_hash = ?",
+            (self.config, self.catalog_hash)
+        )
+
+        return {
+            key: json.loads(result) if result is not None else None
+            for key, result in cursor
+        }
+
+    def save(self, entries):
+        """
+        entries: iterable of (row_key, result or None).
+        """
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO results "
+            "(row_key, config, catalog_hash, result) VALUES (?, ?, ?, ?)",
+            (
+                (
+                    key,
+                    self.config,
+                    self.catalog_hash,
+                    json.dumps({k: _plain(v) for k, v in result.items()})
+                    if result is not None else None
+                )
+                for key, result in entries
+            )
+        )
+
+    def prune(self, live_keys: set) -> int:
+        """
+        Drops this configuration's rows whose key is no longer in Phase C.
+        """
+        stale = [(key,) for key in self.load() if key not in live_keys]
+
+        self._conn.executemany(
+            "DELETE FROM results WHERE row_key = ? AND config = ? AND catalog_hash = ?",
+            ((key, self.config, self.catalog_hash) for (key,) in stale)
+        )
+
+        return len(stale)
+
+    def close(self):
+        self._conn.commit()
+        self._conn.close()
+
+
+def clear_result_store(db_path: str):
+    """
+    Invalidates every stored mapping (e.g. after new corrections).
+    """
+    if not os.path.exists(db_path):
+        return
+
+    conn = sqlite3.connect(db_path)
+    conn.executescript(_SCHEMA)
+    conn.execute("DELETE FROM results")
+    conn.commit()
+    conn.close()
+
+
+def map_rows_incremental(rows, store: ResultStore, map_rows):
+    """
+    Splices stored results with freshly mapped ones.
+    `map_rows` (any batch mapper returning one result per row) only
+    receives rows whose key is not in the store.
+
+    Returns (results in input order, report).
+    """
+    stored = store.load()
+    keys = [row_key(row) for row in rows]
+
+    todo = [i for i, key in enumerate(keys) if key not in stored]
+
+    results = [stored.get(key) for key in keys]
+
+    if todo:
+        fresh = map_rows([rows[i] for i in todo])
+
+        for i, result in zip(todo, fresh):
+            results[i] = result
+
+        store.save((keys[i], results[i]) for i in todo)
+
+    pruned = store.prune(set(keys))
+
+    report = {
+        "rows": len(rows),
+        "reused": len(rows) - len(todo),
+        "mapped": len(todo),
+        "pruned": pruned,
+    }
+
+    return results, report
@@ -1,8 +1,35 @@
 import os
+import json
 import pandas as pd
 
-from .master_loader import load_master_table
-from .mapper import map_row_to_master
+from .catalog_snapshot import load_master_snapshot
+from .mapper import (
+    map_row_to_master,
+    map_rows_to_master,
+    map_rows_by_form,
+    map_rows_by_retrieval,
+    FORM_FALLBACK_THRESHOLD,
+)
+from .candidate_index import (
+    check_shortlist_recall,
+    DEFAULT_SHORTLIST_SIZE,
+    NGRAM_SIZE,
+)
+from .master_catalog import canonical_form
+from .phonetic_index import BLOCK_FALLBACK_THRESHOLD
+from .tfidf_retriever import TfidfRetriever, TFIDF_TOP_K, TFIDF_NGRAM_RANGE
+from .match_cache import (
+    MatchCache,
+    map_rows_with_cache,
+    import_failure_audit,
+    form_scope,
+    backend_scope,
+)
+from .result_store import (
+    ResultStore,
+    map_rows_incremental,
+    clear_result_store,
+)
 from .merge_outputs import merge_fuzzy_csvs
 
 # --------------------------------------------------
@@ -19,14 +46,90 @@ MASTER_PATH = r"D:\new_p_voice_ai_v3\Data_Base\_master_sheet.xlsx"
 
 OUTPUT_DIR = r"D:\new_p_voice_ai_v3\data_pipeline\artifacts\fuzzy_canonical_mapping"
 
+# Compiled master snapshots (rebuilt only when the xlsx changes)
+CATALOG_CACHE_DIR = r"D:\new_p_voice_ai_v3\data_pipeline\artifacts\master_catalog_cache"
+
+# Exact-hit cache + human-confirmed corrections (persistent)
+MATCH_CACHE_DB = os.path.join(OUTPUT_DIR, "phase_D_match_cache.sqlite")
+
+# Row-level Phase D results (only changed Phase C rows are remapped)
+RESULT_STORE_DB = os.path.join(OUTPUT_DIR, "phase_D_result_store.sqlite")
+
+FAILURE_AUDIT_CSV = (
+    r"D:\new_p_voice_ai_v3\data_pipeline\artifacts"
+    r"\evaluation_audit_phase_E\failure_audit.csv"
+)
+
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# --------------------------------------------------
+# MATCHING BACKENDS
+# --------------------------------------------------
+# matrix : batch score matrix over the full catalog (all cores)
+# ngram  : per-row scoring of the n-gram index shortlist
+# phonetic : per-row scoring of the phonetic key block, full-catalog
+#            fallback when the in-block best is weak
+# tfidf  : char n-gram TF-IDF top-k for the whole batch (one sparse
+#          product), RapidFuzz re-ranks the candidates
+# brute  : per-row scoring of the full catalog (reference)
+
+BACKENDS = ("matrix", "ngram", "phonetic", "tfidf", "brute")
+
+# Shortlist parameters a backend's winners depend on (match cache scope)
+BACKEND_SHORTLIST_PARAMS = {
+    "matrix": {},
+    "ngram": {"n": NGRAM_SIZE, "limit": DEFAULT_SHORTLIST_SIZE},
+    "phonetic": {"fallback_threshold": BLOCK_FALLBACK_THRESHOLD},
+    "tfidf": {"top_k": TFIDF_TOP_K, "ngram_range": TFIDF_NGRAM_RANGE},
+    "brute": {},
+}
+
+
+def run_phase_D(
+    backend="matrix",
+    recall_check=False,
+    score_cutoff=0.0,
+    workers=-1,
+    form_aware=False,
+    form_fallback_threshold=FORM_FALLBACK_THRESHOLD,
+    use_match_cache=True,
+    incremental=True,
+    phase_c_csv=None,
+    output_dir=None
+):
+    """
+    backend: one of BACKENDS
+    recall_check: verify the n-gram shortlist holds every brute-force winner
+    score_cutoff: matrix / tfidf backends drop rows whose best score is below it
+    workers: cores used by the matrix backend (-1 = all)
+    form_aware: search the raw_form MEDICINE_TYPE partition first (matrix)
+    form_fallback_threshold: in-partition best below it → full catalog
+    use_match_cache: resolve repeated names / corrections from MATCH_CACHE_DB
+    incremental: reuse RESULT_STORE_DB results of unchanged Phase C rows
+    phase_c_csv / output_dir: default PHASE_C_CSV / OUTPUT_DIR; another
+        output_dir gets its own result store and skips the fuzzy merge
+    Returns the phase_D_fuzzy_all.csv path.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown Phase D backend: {backend}")
+
+    if form_aware and backend != "matrix":
+        raise ValueError("form_aware mapping requires the matrix backend")
+
+    phase_c_csv = phase_c_csv or PHASE_C_CSV
+    output_dir = output_dir or OUTPUT_DIR
+    os.makedirs(output_dir, exist_ok=True)
+
+    result_store_db = (
+        RESULT_STORE_DB if output_dir == OUTPUT_DIR
+        else os.path.join(output_dir, os.path.basename(RESULT_STORE_DB))
+    )
 
-def run_phase_D():
     print("Phase D — Fuzzy Canonical Mapping (CSV-Driven)")
 
-    master_df = load_master_table(MASTER_PATH)
-    phase_c_df = pd.read_csv(PHASE_C_CSV)
+    snapshot = load_master_snapshot(MASTER_PATH, CATALOG_CACHE_DIR)
+    catalog = snapshot["catalog"]
+    phase_c_df = pd.read_csv(phase_c_csv)
 
     required_cols = {
         "file_name",
@@ -42,18 +145,153 @@ def run_phase_D():
             f"{required_cols - set(phase_c_df.columns)}"
         )
 
-    mapped_rows = []
+    candidate_index = snapshot["candidate_index"]
+
+    if recall_check:
+        recall = check_shortlist_recall(phase_c_df, catalog, candidate_index)
+
+        print(
+            f"Shortlist recall: {recall['recall']} "
+            f"({recall['rows_checked']} rows, "
+            f"mean shortlist {recall['mean_shortlist_size']} "
+            f"of {recall['catalog_size']})"
+        )
+
+        if recall["misses"]:
+            raise RuntimeError(
+                f"Shortlist missed brute-force winner: {recall['misses']}"
+            )
+
+    rows = [row.to_dict() for _, row in phase_c_df.iterrows()]
+    form_reports = []
+
+    # Vectorized once per run, only when selected
+    retriever = TfidfRetriever(catalog.names) if backend == "tfidf" else None
+
+    def map_rows(batch):
+        if form_aware:
+            results, form_report = map_rows_by_form(
+                batch,
+                catalog,
+                fallback_threshold=form_fallback_threshold,
+                score_cutoff=score_cutoff,
+                workers=workers
+            )
+            form_reports.append(form_report)
+            return results
+
+        if backend == "matrix":
+            return map_rows_to_master(
+                batch,
+                catalog,
+                score_cutoff=score_cutoff,
+                workers=workers
+            )
 
-    for _, row in phase_c_df.iterrows():
-        result = map_row_to_master(row.to_dict(), master_df)
-        if result:
-            mapped_rows.append(result)
+        if backend == "tfidf":
+            return map_rows_by_retrieval(
+                batch,
+                catalog,
+                retriever,
+                score_cutoff=score_cutoff
+            )
+
+        if backend == "phonetic":
+            return [
+                map_row_to_master(
+                    row,
+                    catalog,
+                    snapshot["phonetic_index"],
+                    fallback_threshold=BLOCK_FALLBACK_THRESHOLD
+                )
+                for row in batch
+            ]
+
+        return [
+            map_row_to_master(
+                row,
+                catalog,
+                candidate_index if backend == "ngram" else None
+            )
+            for row in batch
+        ]
+
+    def map_batch(batch):
+        if not use_match_cache:
+            return map_rows(batch)
+
+        cache = MatchCache(MATCH_CACHE_DB, snapshot["catalog_hash"])
+
+        if form_aware:
+            def scope_of(row):
+                return form_scope(
+                    canonical_form(row.get("raw_form")),
+                    form_fallback_threshold
+                )
+        else:
+            # Decisions are only reused by the backend that made them
+            scope = backend_scope(backend, **BACKEND_SHORTLIST_PARAMS[backend])
+
+            def scope_of(row):
+                return scope
+
+        batch_results = map_rows_with_cache(
+            batch,
+            catalog,
+            cache,
+            map_rows,
+            scope_of=scope_of,
+            score_cutoff=score_cutoff
+        )
+
+        print(f"Match cache: {cache.hits} hits / {cache.hits + cache.misses} lookups")
+        cache.close()
+
+        return batch_results
+
+    if incremental:
+        config = (
+            f"backend={backend};form_aware={form_aware}"
+            f"@{form_fallback_threshold};score_cutoff={score_cutoff};"
+            f"match_cache={use_match_cache}"
+        )
+        store = ResultStore(result_store_db, snapshot["catalog_hash"], config)
+
+        results, store_report = map_rows_incremental(rows, store, map_batch)
+        store.close()
+
+        print(
+            f"Result store: {store_report['reused']} reused, "
+            f"{store_report['mapped']} mapped, {store_report['pruned']} pruned"
+        )
+    else:
+        results = map_batch(rows)
+
+    mapped_rows = [result for result in results if result]
+
+    for form_report in form_reports:
+        print(
+            f"Form-aware fallback rate: {form_report['fallback_rate']} "
+            f"({form_report['fallback_rows']}/{form_report['rows_scored']} rows)"
+        )
+        for form, stats in form_report["partitions"].items():
+            print(
+                f"  {form}: {stats['rows']} rows × {stats['catalog_rows']} SKUs, "
+                f"{stats['fallbacks']} fallbacks, {stats['seconds']}s"
+            )
+
+        with open(
+            os.path.join(output_dir, "phase_D_form_partition_report.json"),
+            "w",
+            encoding="utf-8"
+        ) as f:
+            json.dump(form_report, f, indent=2)
 
     if not mapped_rows:
         raise RuntimeError("No fuzzy mappings produced")
 
     out_csv = os.path.join(
-        OUTPUT_DIR,
+        output_dir,
         "phase_D_fuzzy_all.csv"
     )
 
@@ -61,15 +299,50 @@ def run_phase_D():
 
     print(f"Fuzzy CSV written → {out_csv}")
 
-    print("Merging fuzzy outputs...")
-    merge_fuzzy_csvs()
+    if output_dir == OUTPUT_DIR:
+        print("Merging fuzzy outputs...")
+        merge_fuzzy_csvs()
 
     print("Phase D completed successfully")
 
+    return out_csv
+
+
+def import_corrections():
+    """
+    Imports the Phase E failure audit into the correction dictionary.
+    """
+    snapshot = load_master_snapshot(MASTER_PATH, CATALOG_CACHE_DIR)
+    cache = MatchCache(MATCH_CACHE_DB, snapshot["catalog_hash"])
+
+    imported = import_failure_audit(
+        cache,
+        FAILURE_AUDIT_CSV,
+        os.path.join(OUTPUT_DIR, "phase_D_fuzzy_all.csv"),
+        snapshot["catalog"]
+    )
+    cache.close()
+
+    # Stored row results predate the corrections
+    clear_result_store(RESULT_STORE_DB)
+
+    print(f"Imported {imported} corrections → {MATCH_CACHE_DB}")
+
 
 if __name__ == "__main__":
     # python -m data_pipeline.phase_D_fuzzy_canonical_mapping.run_phase_D
-    run_phase_D()
+    # python -m data_pipeline.phase_D_fuzzy_canonical_mapping.run_phase_D --recall-check
+    # python -m data_pipeline.phase_D_fuzzy_canonical_mapping.run_phase_D --import-corrections
+    # python -m data_pipeline.phase_D_fuzzy_canonical_mapping.run_phase_D --backend=tfidf
+    import sys
+    if "--import-corrections" in sys.argv:
+        import_corrections()
+    else:
+        backend = next(
+            (arg.split("=", 1)[1] for arg in sys.argv if arg.startswith("--backend=")),
+            "matrix"
+        )
+        run_phase_D(backend=backend, recall_check="--recall-check" in sys.argv)
 
 # RUNNER : 
 # python -m data_pipeline.phase_D_fuzzy_canonical_mapping.run_phase_D
@@ -0,0 +1,114 @@
+# ======================================================
+# PHASE D — SPARSE CHAR N-GRAM TF-IDF RETRIEVAL
+# ======================================================
+# - Catalog vectorized ONCE (char_wb n-gram TF-IDF, CSR)
+# - A whole Phase C batch is retrieved with one sparse
+#   matrix product per chunk: Q (rows × F) · Cᵀ (F × SKUs)
+# - Top-k cosine candidates per row are re-ranked with the
+#   0.60 / 0.40 RapidFuzz score (compute_fuzzy_scores)
+# - Rows left without candidates by max_df pruning are retried
+#   on an unpruned index (built once, on demand)
+# ======================================================
+
+from typing import List
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# ------------------------------------------------------
+# PARAMETERS (TUNABLE, NOT HARD-CODED)
+# ------------------------------------------------------
+
+TFIDF_NGRAM_RANGE = (3, 3)
+TFIDF_TOP_K = 25
+
+# n-grams present in more catalog rows than this are dropped
+# (absolute count: small catalogs are never pruned, on a 100k-SKU
+# catalog the ubiquitous form / strength grams no longer densify Q·Cᵀ)
+TFIDF_MAX_DF = 1000
+
+# Query rows per sparse product (bounds the similarity block)
+TFIDF_CHUNK_ROWS = 512
+
+
+class TfidfRetriever:
+    """
+    Character n-gram TF-IDF index over CLEANED_MEDICINE_NAME.
+    """
+
+    def __init__(self, names: List[str], ngram_range=TFIDF_NGRAM_RANGE,
+                 max_df: int = TFIDF_MAX_DF):
+        self.names = list(names)
+        self.ngram_range = ngram_range
+
+        self.vectorizer, self.catalog_t = self._fit(max_df)
+
+        # Unpruned index, built on the first query sharing only
+        # pruned (high-df) n-grams with the catalog
+        self._unpruned = None
+
+    def _fit(self, max_df):
+        vectorizer = TfidfVectorizer(
+            analyzer="char_wb",
+            ngram_range=self.ngram_range,
+            lowercase=False,
+            sublinear_tf=True,
+            max_df=max_df,
+            dtype=np.float32
+        )
+
+        # L2-normalised rows → dot product = cosine similarity
+        return vectorizer, vectorizer.fit_transform(self.names).T.tocsr()
+
+    @staticmethod
+    def _top_k(vectorizer, catalog_t, queries, k):
+        results = []
+
+        for start in range(0, len(queries), TFIDF_CHUNK_ROWS):
+            chunk = queries[start:start + TFIDF_CHUNK_ROWS]
+            sims = (vectorizer.transform(chunk) @ catalog_t).tocsr()
+
+            for row in range(sims.shape[0]):
+                lo, hi = sims.indptr[row], sims.indptr[row + 1]
+                cols = sims.indices[lo:hi]
+                vals = sims.data[lo:hi]
+
+                if len(cols) > k:
+                    # Highest similarity first, lowest row id on ties
+                    order = np.lexsort((cols, -vals))[:k]
+                    cols = cols[order]
+
+                results.append(np.sort(cols).tolist())
+
+        return results
+
+    def top_k(self, queries: List[str], k: int = TFIDF_TOP_K) -> List[List[int]]:
+        """
+        Per query, up to k catalog row ids with the highest cosine
+        similarity, returned in catalog order (RapidFuzz tie-breaking
+        then matches a full-catalog scan).
+        Queries sharing only pruned n-grams with the catalog are
+        retried on the unpruned index; [] = no n-gram in common.
+        """
+        results = self._top_k(self.vectorizer, self.catalog_t, queries, k)
+
+        missed = [i for i, row_ids in enumerate(results) if not row_ids]
+        if missed:
+            if self._unpruned is None:
+                self._unpruned = self._fit(1.0)
+
+            retried = self._top_k(*self._unpruned, [queries[i] for i in missed], k)
+            for i, row_ids in zip(missed, retried):
+                results[i] = row_ids
+
+        return results
+
+    def candidates(self, queries: List[str], k: int = TFIDF_TOP_K) -> List[List[str]]:
+        """
+        Candidate names per query; a query sharing no n-gram with the
+        catalog falls back to the full catalog.
+        """
+        return [
+            [self.names[i] for i in row_ids] if row_ids else list(self.names)
+            for row_ids in self.top_k(queries, k)
+        ]
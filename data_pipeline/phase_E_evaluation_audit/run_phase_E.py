@@ -31,10 +31,18 @@ OUT_DIR = (
 os.makedirs(OUT_DIR, exist_ok=True)
 
 
-def run_phase_E():
+def run_phase_E(pred_csv=None, out_dir=None):
+    """
+    pred_csv / out_dir: default PHASE_D_PRED_CSV / OUT_DIR
+    (overridden by side-by-side comparisons). Returns the metrics.
+    """
+    pred_csv = pred_csv or PHASE_D_PRED_CSV
+    out_dir = out_dir or OUT_DIR
+    os.makedirs(out_dir, exist_ok=True)
+
     print("Phase E — Evaluation")
 
-    pred_df = load_phase_d_predictions(PHASE_D_PRED_CSV)
+    pred_df = load_phase_d_predictions(pred_csv)
     gt_df = load_ground_truth(GROUND_TRUTH_XLSX)
 
     # HARD ALIGNMENT GUARANTEE
@@ -75,42 +83,42 @@ def run_phase_E():
     summary_df = summarize_failures(failure_df)
 
     # ---------------- OUTPUTS ----------------
-    with open(os.path.join(OUT_DIR, "metrics.json"), "w") as f:
-        json.dump(
-            {
-                **cls_metrics,
-                "quantity_mae": quantity_mae,
-                "mean_wer": mean_wer,
-                "mean_cer": mean_cer,
-                "rows_evaluated": rows_evaluated,
-                "rows_with_quantity": rows_with_quantity,
-            },
-            f,
-            indent=2
-        )
+    metrics = {
+        **cls_metrics,
+        "quantity_mae": quantity_mae,
+        "mean_wer": mean_wer,
+        "mean_cer": mean_cer,
+        "rows_evaluated": rows_evaluated,
+        "rows_with_quantity": rows_with_quantity,
+    }
+
+    with open(os.path.join(out_dir, "metrics.json"), "w") as f:
+        json.dump(metrics, f, indent=2)
 
     eval_df.to_csv(
-        os.path.join(OUT_DIR, "aligned_predictions_vs_gt.csv"),
+        os.path.join(out_dir, "aligned_predictions_vs_gt.csv"),
         index=False
     )
 
     wer_cer_df.to_csv(
-        os.path.join(OUT_DIR, "wer_cer_report.csv"),
+        os.path.join(out_dir, "wer_cer_report.csv"),
         index=False
     )
 
     failure_df.to_csv(
-        os.path.join(OUT_DIR, "failure_audit.csv"),
+        os.path.join(out_dir, "failure_audit.csv"),
         index=False
     )
 
     summary_df.to_csv(
-        os.path.join(OUT_DIR, "failure_summary.csv"),
+        os.path.join(out_dir, "failure_summary.csv"),
         index=False
     )
 
     print("Phase E completed successfully")
 
+    return metrics
+
 
 if __name__ == "__main__":
     run_phase_E()
@@ -7,21 +7,39 @@ CONFIG_PATH = r"D:\new_p_voice_ai_v3\data_pipeline\configs\audio_preprocess_conf
 
 SUPPORTED_EXT = (".wav", ".mp3", ".m4a", ".aac")
 
-for file in os.listdir(RAW_AUDIO_DIR):
-    if file.lower().endswith(SUPPORTED_EXT):
-        input_path = os.path.join(RAW_AUDIO_DIR, file)
-        output_path = os.path.join(
-            PROCESSED_AUDIO_DIR,
-            os.path.splitext(file)[0] + ".wav"
-        )
-
-        meta = preprocess_audio(
-            input_path=input_path,
-            output_path=output_path,
-            config_path=CONFIG_PATH
-        )
-
-        print(f"Processed: {file} → {meta['output_path']}")
-
-# RUNNER : 
+
+def run_phase_A(return_samples=False):
+    """
+    return_samples=True: {processed file name: float32 samples} for an
+    in-process Phase B handoff (run_phase_B(handoff_samples=...)).
+    """
+    handoff = {}
+
+    for file in os.listdir(RAW_AUDIO_DIR):
+        if file.lower().endswith(SUPPORTED_EXT):
+            input_path = os.path.join(RAW_AUDIO_DIR, file)
+            output_path = os.path.join(
+                PROCESSED_AUDIO_DIR,
+                os.path.splitext(file)[0] + ".wav"
+            )
+
+            meta = preprocess_audio(
+                input_path=input_path,
+                output_path=output_path,
+                config_path=CONFIG_PATH,
+                return_samples=return_samples
+            )
+
+            if return_samples:
+                handoff[os.path.basename(output_path)] = meta["samples"]
+
+            print(f"Processed: {file} → {meta['output_path']}")
+
+    return handoff
+
+
+if __name__ == "__main__":
+    run_phase_A()
+
+# RUNNER :
 # python -m data_pipeline.run_phase_A
@@ -1,40 +1,411 @@
+import gc
 import os
-from data_pipeline.phase_B_transcription import transcribe_audio
+from functools import partial
+import time
+import multiprocessing as mp
+
+from data_pipeline.phase_B_transcription import (
+    transcribe_audio,
+    transcribe_audio_batch,
+    audio_seconds,
+    LongAudioPool,
+)
+from data_pipeline.transcript_store import open_transcript_store, SEGMENT_COLUMNS
+from data_pipeline.audio_handoff import benchmark_audio_handoff
+from data_pipeline.phase_B_cascade import run_cascade
+from data_pipeline.decode_profiles import DECODE_PROFILES, decode_options
 
 
 PROCESSED_AUDIO_DIR = (
     r"D:\new_p_voice_ai_v3\data_pipeline\artifacts\audio_processed"
 )
 
+# Single append-only transcript store (replaces transcription_<n>.csv)
+TRANSCRIPT_STORE_DB = (
+    r"D:\new_p_voice_ai_v3\data_pipeline\artifacts"
+    r"\transcript_store\transcripts.sqlite"
+)
+
+# Former per-file CSVs (imported into an empty store; audit export)
 TRANSCRIPT_DIR = (
     r"D:\new_p_voice_ai_v3\data_pipeline\artifacts\transcripts_raw"
 )
 
+# Files per Whisper batch (1 = model.transcribe per file)
+BATCH_SIZE = 1
+
+# Phase B worker processes (1 = in-process)
+WORKERS = 1
+
+
+def _list_audio():
+    return [
+        os.path.join(PROCESSED_AUDIO_DIR, file)
+        for file in sorted(os.listdir(PROCESSED_AUDIO_DIR))
+        if file.lower().endswith(".wav")
+    ]
+
+
+# ------------------------------------------------------
+# WORK ITEMS (in-process or forked worker)
+# ------------------------------------------------------
+
+# Model injected by the agent, inherited copy-on-write by forked workers
+_WORKER_MODEL = None
+
+# Phase A samples handed over in-process (file name → float32 array)
+_HANDOFF_SAMPLES = {}
+
+# FeatureCache of the run (inherited by forked workers, which
+# reopen its index; their hit counts stay in the worker)
+_FEATURE_CACHE = None
+
+
+def _init_worker(threads):
+    import torch
+
+    torch.set_num_threads(threads)
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["MKL_NUM_THREADS"] = str(threads)
+
+
+def _transcribe_item(audio_paths, model=None, store=None, vad=False,
+                     long_audio=False, long_audio_pool=None, decode_profile=None,
+                     watchdog=False):
+    """
+    One work item = one Whisper batch of audio_paths.
+    Returns [(audio_path, rows, audio_seconds, watchdog cut-offs)].
+    """
+    model = model or _WORKER_MODEL
+
+    guard = None
+    if watchdog:
+        # Imported here: torch / whisper only when the watchdog runs
+        from data_pipeline.decode_watchdog import DecodeWatchdog
+        guard = DecodeWatchdog()
+
+    samples = [_HANDOFF_SAMPLES.get(os.path.basename(path)) for path in audio_paths]
+
+    # The feature cache lives on the batched path (also for one file)
+    if len(audio_paths) > 1 or _FEATURE_CACHE is not None:
+        out = transcribe_audio_batch(
+            model=model,
+            audio_paths=audio_paths,
+            store=store,
+            samples=samples,
+            feature_cache=_FEATURE_CACHE,
+            decode_profile=decode_profile,
+            watchdog=guard
+        )
+        return [
+            (path, *out[path], guard.cutoffs.get(path, 0) if guard else 0)
+            for path in audio_paths
+        ]
+
+    audio_path = audio_paths[0]
+    rows = transcribe_audio(
+        model=model,
+        audio_path=audio_path,
+        store=store,
+        vad=vad,
+        long_audio=long_audio,
+        long_audio_pool=long_audio_pool,
+        samples=samples[0],
+        decode_profile=decode_profile,
+        watchdog=guard
+    )
+    return [(
+        audio_path,
+        rows,
+        audio_seconds(audio_path),
+        guard.cutoffs.get(audio_path, 0) if guard else 0
+    )]
+
+
+def _iter_pool(model, items, workers, threads_per_worker, vad=False, long_audio=False,
+               decode_profile=None, watchdog=False):
+    """
+    Forks workers after the model is loaded (weights shared copy-on-write);
+    imap_unordered with chunksize=1 acts as the work queue.
+    """
+    global _WORKER_MODEL
+    _WORKER_MODEL = model
+
+    # Keep the inherited model objects out of the collector's writes
+    gc.collect()
+    gc.freeze()
+
+    try:
+        with mp.get_context("fork").Pool(
+            processes=workers,
+            initializer=_init_worker,
+            initargs=(threads_per_worker,)
+        ) as pool:
+            yield from pool.imap_unordered(
+                partial(
+                    _transcribe_item,
+                    vad=vad,
+                    long_audio=long_audio,
+                    decode_profile=decode_profile,
+                    watchdog=watchdog
+                ),
+                items,
+                chunksize=1
+            )
+    finally:
+        gc.unfreeze()
+        _WORKER_MODEL = None
+
+
+def _transcribe_all(model, audio_paths, store, batch_size, workers, threads_per_worker,
+                    vad=False, long_audio=False, decode_profile=None, watchdog=False):
+    """
+    Transcribes audio_paths; rows are appended by this process only.
+    Returns (files, audio_seconds, elapsed).
+    Pools are forked before this process runs any inference
+    (torch's GNU OpenMP runtime is not fork-safe once used).
+    """
+    items = [
+        audio_paths[b:b + batch_size]
+        for b in range(0, len(audio_paths), batch_size)
+    ]
+
+    if (vad or long_audio) and batch_size > 1:
+        raise ValueError("VAD / long-audio chunking runs per file (batch_size=1)")
+
+    if (vad or long_audio) and _FEATURE_CACHE is not None:
+        raise ValueError("The feature cache does not cover VAD / long-audio chunks")
+
+    if workers > 1 and "fork" not in mp.get_all_start_methods():
+        # spawn would reload the model in every worker
+        print("Phase B: fork not available on this platform, running in-process")
+        workers = 1
+
+    # In-process run: long files get the chunk pool (file workers
+    # chunk their long files in turn, pools do not nest)
+    long_audio_pool = None
+    if long_audio and workers == 1 and "fork" in mp.get_all_start_methods():
+        long_audio_pool = LongAudioPool(model)
+
+    started = time.perf_counter()
+    total_audio = 0.0
+    files = 0
+    rescued, cutoffs, flagged = 0, 0, 0
+    flag_col = SEGMENT_COLUMNS.index("watchdog")
+
+    if workers > 1:
+        results = _iter_pool(
+            model, items, workers, threads_per_worker, vad, long_audio, decode_profile,
+            watchdog
+        )
+    else:
+        results = (
+            _transcribe_item(
+                item,
+                model=model,
+                vad=vad,
+                long_audio=long_audio,
+                long_audio_pool=long_audio_pool,
+                decode_profile=decode_profile,
+                watchdog=watchdog
+            )
+            for item in items
+        )
+
+    try:
+        for item_results in results:
+            if store is not None:
+                store.append(
+                    [row for _, rows, _, _ in item_results for row in rows]
+                )
+
+            for audio_path, rows, file_audio, file_cutoffs in item_results:
+                total_audio += file_audio
+                files += 1
+                print(f"Transcribed: {os.path.basename(audio_path)}")
 
-def run_phase_B(model):
+                if file_cutoffs:
+                    rescued += 1
+                    cutoffs += file_cutoffs
+                    print(
+                        f"Watchdog: {os.path.basename(audio_path)} "
+                        f"{file_cutoffs} runaway decodes cut off"
+                    )
+                flagged += sum(row[flag_col] is not None for row in rows)
+    finally:
+        if long_audio_pool is not None:
+            long_audio_pool.close()
+
+    if watchdog:
+        print(
+            f"Watchdog: {rescued} of {files} files rescued "
+            f"({cutoffs} decodes cut off, {flagged} segments flagged)"
+        )
+
+    return files, total_audio, time.perf_counter() - started
+
+
+def _print_throughput(files, audio_seconds, elapsed, batch_size, workers):
+    if not files or elapsed <= 0:
+        return
+
+    print(
+        f"Phase B throughput (workers={workers}, batch_size={batch_size}): "
+        f"{files} files, {audio_seconds:.1f}s audio in {elapsed:.2f}s "
+        f"({files / elapsed:.2f} files/s, "
+        f"{audio_seconds / elapsed:.2f}x realtime)"
+    )
+
+
+def run_phase_B(model, batch_size=BATCH_SIZE, workers=WORKERS, threads_per_worker=1,
+                store_db=None, legacy_csv_dir=None, vad=False, long_audio=False,
+                handoff_samples=None, feature_cache=None, decode_profile=None,
+                watchdog=False):
     """
     Phase B runner.
     Model must be injected by Execution Controller.
+    batch_size > 1 decodes that many files per Whisper batch.
+    workers > 1 forks that many processes sharing the model
+    (threads_per_worker from ExecutionControllerAgent.plan_phase_B_workers).
+    store_db / legacy_csv_dir: default TRANSCRIPT_STORE_DB / TRANSCRIPT_DIR
+    ("" = no legacy import). Returns (files, audio seconds, seconds).
+    vad=True transcribes speech chunks only (data_pipeline.phase_B_vad).
+    long_audio=True splits long recordings into parallel overlapping chunks.
+    handoff_samples: {file name: float32 array} from run_phase_A(return_samples=True);
+    other files are read in-process from PROCESSED_AUDIO_DIR (audio_handoff).
+    feature_cache: data_pipeline.feature_cache.FeatureCache of this model;
+    log-mel / encoder outputs of unchanged audio are reused.
+    decode_profile: "accurate" / "balanced" / "fast" (data_pipeline.decode_profiles;
+    None = Whisper defaults), recorded with every segment.
+    watchdog=True cuts off runaway decodes (data_pipeline.decode_watchdog),
+    flags the segments and counts the rescued files.
     """
 
     if model is None:
         raise RuntimeError("Model not provided to run_phase_B")
 
-    os.makedirs(TRANSCRIPT_DIR, exist_ok=True)
+    # Unknown profile names fail before any file is transcribed
+    decode_options(decode_profile)
 
-    for file in sorted(os.listdir(PROCESSED_AUDIO_DIR)):
-        if file.lower().endswith(".wav"):
-            audio_path = os.path.join(PROCESSED_AUDIO_DIR, file)
+    store = open_transcript_store(
+        store_db or TRANSCRIPT_STORE_DB,
+        TRANSCRIPT_DIR if legacy_csv_dir is None else legacy_csv_dir
+    )
 
-            output_csv = os.path.join(
-                TRANSCRIPT_DIR,
-                f"transcription_{os.path.splitext(file)[0]}.csv"
-            )
+    global _HANDOFF_SAMPLES, _FEATURE_CACHE
+    _HANDOFF_SAMPLES = handoff_samples or {}
+    _FEATURE_CACHE = feature_cache
+
+    try:
+        files, audio_seconds, elapsed = _transcribe_all(
+            model, _list_audio(), store, batch_size, workers, threads_per_worker,
+            vad, long_audio, decode_profile, watchdog
+        )
+    finally:
+        store.close()
+        _HANDOFF_SAMPLES = {}
+        _FEATURE_CACHE = None
+
+    _print_throughput(files, audio_seconds, elapsed, batch_size, workers)
+
+    if feature_cache is not None:
+        print(feature_cache.summary())
+
+    return files, audio_seconds, elapsed
+
+
+def run_phase_B_cascade(models, store_db=None, legacy_csv_dir=None, decode_profile=None,
+                        watchdog=False, handoff_samples=None):
+    """
+    Phase B small → large cascade.
+    models: {"small", "large"} from ExecutionControllerAgent.load_cascade_models.
+    decode_profile / watchdog / handoff_samples: as run_phase_B, for both tiers.
+    Returns the cascade report.
+    """
+
+    if not models or models.get("small") is None or models.get("large") is None:
+        raise RuntimeError("Cascade models not provided to run_phase_B_cascade")
+
+    # Unknown profile names fail before any file is transcribed
+    decode_options(decode_profile)
+
+    store = open_transcript_store(
+        store_db or TRANSCRIPT_STORE_DB,
+        TRANSCRIPT_DIR if legacy_csv_dir is None else legacy_csv_dir
+    )
+
+    try:
+        return run_cascade(
+            models, _list_audio(), store, decode_profile, watchdog, handoff_samples
+        )
+    finally:
+        store.close()
 
-            transcribe_audio(
-                model=model,
-                audio_path=audio_path,
-                output_csv=output_csv
-            )
 
-            print(f"Transcribed: {file}")
+def benchmark_workers(model, agent, worker_counts, batch_size=BATCH_SIZE, limit=None):
+    """
+    Throughput vs worker count on the processed audio (nothing persisted).
+    Returns [(workers, threads_per_worker, files/s, x realtime)].
+    """
+    audio_paths = _list_audio()[:limit]
+    report = []
+
+    # Multi-worker runs first: forking after in-process inference is unsafe
+    for workers in sorted(worker_counts, reverse=True):
+        threads = agent.plan_phase_B_workers(workers)
+
+        files, audio_seconds, elapsed = _transcribe_all(
+            model, audio_paths, None, batch_size, workers, threads
+        )
+        _print_throughput(files, audio_seconds, elapsed, batch_size, workers)
+
+        report.append((workers, threads, files / elapsed, audio_seconds / elapsed))
+
+    print("\nworkers  threads  files/s  x realtime")
+    for workers, threads, files_per_s, realtime in report:
+        print(f"{workers:>7}  {threads:>7}  {files_per_s:>7.2f}  {realtime:>10.2f}")
+
+    return report
+
+
+def benchmark_decode_profiles(model, profiles=None, limit=None):
+    """
+    Per-file wall time of every decode profile (in-process, nothing persisted).
+    Returns {profile: [(file_name, seconds, audio_seconds)]}.
+    """
+    audio_paths = _list_audio()[:limit]
+    report = {}
+
+    for profile in profiles or list(DECODE_PROFILES):
+        timings = []
+
+        for audio_path in audio_paths:
+            started = time.perf_counter()
+            transcribe_audio(model=model, audio_path=audio_path, decode_profile=profile)
+            elapsed = time.perf_counter() - started
+
+            timings.append((os.path.basename(audio_path), elapsed, audio_seconds(audio_path)))
+            print(f"[{profile}] {os.path.basename(audio_path)}: {elapsed:.2f}s")
+
+        report[profile] = timings
+
+    print("\nprofile     files  mean s/file  max s/file  x realtime")
+    for profile, timings in report.items():
+        if not timings:
+            continue
+
+        seconds = [t for _, t, _ in timings]
+        realtime = sum(a for _, _, a in timings) / sum(seconds)
+        print(
+            f"{profile:<10}  {len(timings):>5}  {sum(seconds) / len(seconds):>11.2f}  "
+            f"{max(seconds):>10.2f}  {realtime:>10.2f}"
+        )
+
+    return report
+
+
+def benchmark_audio_loading(limit=None):
+    """
+    Per-file time saved by the in-process audio handoff vs ffmpeg.
+    """
+    return benchmark_audio_handoff(_list_audio()[:limit])
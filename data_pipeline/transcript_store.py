@@ -0,0 +1,286 @@
+# ======================================================
+# TRANSCRIPT STORE (PHASE B → C / LATENCY)
+# ======================================================
+# Single append-only SQLite store (WAL) of Whisper segments,
+# replacing one transcription_<n>.csv per audio.
+#
+# - Segment schema = transcribe_audio CSV columns
+#   (+ model_tier: Whisper tier that produced the file,
+#    decode_profile: Phase B decode profile of the run,
+#    watchdog: runaway-decode flag of the segment)
+# - Indexed by file_name and run_id
+# - Readers select only the columns / files they need;
+#   by default the latest run of every file
+# - export_csv() writes the per-file CSVs for auditors
+#   (former Phase B layout and value formatting, plus the
+#    columns above; csv.writer CRLF line endings, so not
+#    byte-identical to the CSVs already in transcripts_raw)
+# ======================================================
+
+import os
+import csv
+import sqlite3
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path
+
+import pandas as pd
+
+# --------------------------------------------------
+# PATHS
+# --------------------------------------------------
+
+TRANSCRIPT_STORE_DB = (
+    r"D:\new_p_voice_ai_v3\data_pipeline\artifacts"
+    r"\transcript_store\transcripts.sqlite"
+)
+
+# Former per-file CSV artifacts (legacy import / audit export)
+TRANSCRIPT_CSV_DIR = r"D:\new_p_voice_ai_v3\data_pipeline\artifacts\transcripts_raw"
+
+# --------------------------------------------------
+# SCHEMA
+# --------------------------------------------------
+
+SEGMENT_COLUMNS = (
+    "file_name",
+    "segment_id",
+    "start_time_sec",
+    "end_time_sec",
+    "duration_sec",
+    "raw_transcript",
+    "language",
+    "audio_path",
+    "run_id",
+    "model_tier",
+    "decode_profile",
+    "watchdog",
+)
+
+_INT_COLUMNS = {"segment_id"}
+_REAL_COLUMNS = {"start_time_sec", "end_time_sec", "duration_sec"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (
+    file_name       TEXT NOT NULL,
+    segment_id      INTEGER NOT NULL,
+    start_time_sec  REAL,
+    end_time_sec    REAL,
+    duration_sec    REAL,
+    raw_transcript  TEXT,
+    language        TEXT,
+    audio_path      TEXT,
+    run_id          TEXT NOT NULL,
+    model_tier      TEXT,
+    decode_profile  TEXT,
+    watchdog        TEXT,
+    UNIQUE (file_name, run_id, segment_id)
+);
+CREATE INDEX IF NOT EXISTS idx_segments_file ON segments (file_name);
+CREATE INDEX IF NOT EXISTS idx_segments_run ON segments (run_id);
+"""
+
+# Columns added after the first release: name → SQL type
+# (ALTER TABLE on stores created before them)
+_ADDED_COLUMNS = {
+    "model_tier": "TEXT",
+    "decode_profile": "TEXT",
+    "watchdog": "TEXT",
+}
+
+# Latest run of a file = run of its most recently appended segment
+_LATEST_RUN = (
+    "run_id = (SELECT s2.run_id FROM segments s2 "
+    "WHERE s2.file_name = segments.file_name "
+    "ORDER BY s2.rowid DESC LIMIT 1)"
+)
+
+
+class TranscriptStore:
+
+    def __init__(self, db_path: str = TRANSCRIPT_STORE_DB):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+
+        self.db_path = db_path
+
+        self._conn = sqlite3.connect(db_path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        existing = {
+            row[1] for row in self._conn.execute("PRAGMA table_info(segments)")
+        }
+
+        with self._conn:
+            for column, sql_type in _ADDED_COLUMNS.items():
+                if column not in existing:
+                    self._conn.execute(
+                        f"ALTER TABLE segments ADD COLUMN {column} {sql_type}"
+                    )
+
+    # --------------------------------------------------
+    # WRITE (append-only)
+    # --------------------------------------------------
+
+    def append(self, rows):
+        """
+        rows: sequences in SEGMENT_COLUMNS order (one transaction).
+        """
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT INTO segments ({', '.join(SEGMENT_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(SEGMENT_COLUMNS))})",
+                rows
+            )
+
+    # --------------------------------------------------
+    # READ
+    # --------------------------------------------------
+
+    def _where(self, file_names=None, run_id=None):
+        clauses, params = [], []
+
+        if run_id is not None:
+            clauses.append("run_id = ?")
+            params.append(run_id)
+        else:
+            clauses.append(_LATEST_RUN)
+
+        if file_names is not None:
+            file_names = list(file_names)
+            clauses.append(f"file_name IN ({', '.join('?' * len(file_names))})")
+            params.extend(file_names)
+
+        return " AND ".join(clauses), params
+
+    def rows(self, columns=SEGMENT_COLUMNS, file_names=None, run_id=None):
+        """
+        Cursor over segment tuples ordered by (file_name, segment_id).
+        run_id=None → latest run of every file.
+        """
+        unknown = set(columns) - set(SEGMENT_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown transcript columns: {unknown}")
+
+        where, params = self._where(file_names, run_id)
+
+        return self._conn.execute(
+            f"SELECT {', '.join(columns)} FROM segments WHERE {where} "
+            f"ORDER BY file_name, segment_id",
+            params
+        )
+
+    def read(self, columns=SEGMENT_COLUMNS, file_names=None, run_id=None) -> pd.DataFrame:
+        return pd.DataFrame(
+            self.rows(columns, file_names, run_id).fetchall(),
+            columns=list(columns)
+        )
+
+    def file_names(self, run_id=None):
+        where, params = self._where(run_id=run_id)
+
+        return [
+            name for (name,) in self._conn.execute(
+                f"SELECT DISTINCT file_name FROM segments WHERE {where} "
+                f"ORDER BY file_name",
+                params
+            )
+        ]
+
+    def is_empty(self) -> bool:
+        return self._conn.execute("SELECT 1 FROM segments LIMIT 1").fetchone() is None
+
+    def close(self):
+        self._conn.close()
+
+
+# --------------------------------------------------
+# CSV EXPORT / LEGACY IMPORT
+# --------------------------------------------------
+
+def csv_stem(file_name: str) -> str:
+    """
+    1.wav → transcription_1 (former Phase B artifact name)
+    """
+    return f"transcription_{os.path.splitext(file_name)[0]}"
+
+
+def export_csv(store: TranscriptStore, export_dir: str = TRANSCRIPT_CSV_DIR,
+               run_id=None):
+    """
+    One transcription_<n>.csv per audio, as Phase B used to write them.
+    """
+    os.makedirs(export_dir, exist_ok=True)
+
+    exported = 0
+
+    for file_name, rows in groupby(store.rows(run_id=run_id), key=itemgetter(0)):
+        output_csv = os.path.join(export_dir, f"{csv_stem(file_name)}.csv")
+
+        # csv.writer: None → "", floats as repr (as transcribe_audio wrote them)
+        with open(output_csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(SEGMENT_COLUMNS)
+            writer.writerows(rows)
+
+        exported += 1
+
+    return exported
+
+
+def _parse(column, value):
+    # Columns missing from older CSVs (e.g. model_tier, watchdog)
+    if value is None:
+        return None
+    if column in _INT_COLUMNS:
+        return int(value) if value != "" else None
+    if column in _REAL_COLUMNS:
+        return float(value) if value != "" else None
+    return value
+
+
+def import_csv_dir(store: TranscriptStore, csv_dir: str = TRANSCRIPT_CSV_DIR) -> int:
+    """
+    Appends existing transcription_*.csv artifacts to the store.
+    """
+    imported = 0
+
+    for csv_file in sorted(Path(csv_dir).glob("transcription_*.csv")):
+        with open(csv_file, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            store.append(
+                [_parse(col, row.get(col)) for col in SEGMENT_COLUMNS]
+                for row in reader
+            )
+        imported += 1
+
+    return imported
+
+
+def open_transcript_store(db_path: str = TRANSCRIPT_STORE_DB,
+                          legacy_csv_dir: str = TRANSCRIPT_CSV_DIR) -> TranscriptStore:
+    """
+    Opens the store; on first use it is backfilled from the former
+    per-file CSV artifacts, if any.
+    """
+    store = TranscriptStore(db_path)
+
+    if store.is_empty() and legacy_csv_dir and os.path.isdir(legacy_csv_dir):
+        imported = import_csv_dir(store, legacy_csv_dir)
+        if imported:
+            print(f"Transcript store: imported {imported} legacy CSVs → {db_path}")
+
+    return store
+
+
+if __name__ == "__main__":
+    # python -m data_pipeline.transcript_store --export-csv
+    import sys
+    store = open_transcript_store()
+    if "--export-csv" in sys.argv:
+        exported = export_csv(store)
+        print(f"Exported {exported} transcription CSVs → {TRANSCRIPT_CSV_DIR}")
+    store.close()
@@ -2,7 +2,8 @@ from agent_state import AgentState
 from agent_reasoner import AgentReasoner
 from agent_memory import AgentMemory
 from agent_transitions import ALLOWED_TRANSITIONS
-from runtime_resources import configure_runtime
+from runtime_resources import configure_runtime, split_thread_budget
+from model_quantization import QUANTIZATION_MODES, quantize_dynamic_int8
 
 import whisper
 import torch
@@ -25,6 +26,8 @@ class ExecutionControllerAgent:
         self.reasoner = AgentReasoner()
         self.memory = AgentMemory()
         self.model = None
+        self.model_key = None
+        self.cascade_models = {}
 
     # ==============================
     # CPU THREAD CONTROL (CRITICAL)
@@ -85,25 +88,106 @@ class ExecutionControllerAgent:
     # ==============================
     # WHISPER MODEL LIFECYCLE
     # ==============================
-    def load_model(self, model_name="large-v1", device="cpu"):
+    def load_model(self, model_name="large-v1", device="cpu", quantization=None):
         """
         Load Whisper model ONLY in ACT state.
         Thread configuration is already applied before inference.
+        quantization: None (fp32) or "int8" (dynamic int8 Linear
+        layers, CPU only). Another name / mode replaces the loaded model.
         """
         if self.state != AgentState.ACT:
             raise RuntimeError(
                 "Model loading attempted outside ACT state"
             )
 
-        if self.model is None:
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown quantization mode: {quantization}")
+
+        if quantization is not None and device != "cpu":
+            raise ValueError("Dynamic int8 quantization is CPU only")
+
+        model_key = (model_name, device, quantization)
+
+        if self.model is None or self.model_key != model_key:
+            self.model = None
+
             print(
                 f"[{self.name}] Loading Whisper model: {model_name} on {device}"
+                f" ({quantization or 'fp32'})"
             )
-            self.model = whisper.load_model(model_name, device=device)
+            model = whisper.load_model(model_name, device=device)
+
+            if quantization == "int8":
+                model = quantize_dynamic_int8(model)
+
+            self.model = model
+            self.model_key = model_key
             print(f"[{self.name}] Whisper model loaded successfully")
 
         return self.model
 
+    def load_cascade_models(self, small_model="small", large_model="large-v1",
+                            device="cpu", quantization=None):
+        """
+        Both Phase B cascade tiers, resident together (ACT only).
+        Returns {"small": model, "large": model}.
+        """
+        if self.state != AgentState.ACT:
+            raise RuntimeError(
+                "Model loading attempted outside ACT state"
+            )
+
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown quantization mode: {quantization}")
+
+        for tier, model_name in (("small", small_model), ("large", large_model)):
+            model_key = (model_name, device, quantization)
+            loaded = self.cascade_models.get(tier)
+
+            if loaded is not None and loaded[0] == model_key:
+                continue
+
+            # Reuse the single-model slot when it already holds this model
+            if self.model is not None and self.model_key == model_key:
+                self.cascade_models[tier] = (model_key, self.model)
+                continue
+
+            print(
+                f"[{self.name}] Loading cascade tier {tier}: {model_name} "
+                f"on {device} ({quantization or 'fp32'})"
+            )
+            model = whisper.load_model(model_name, device=device)
+
+            if quantization == "int8":
+                model = quantize_dynamic_int8(model)
+
+            self.cascade_models[tier] = (model_key, model)
+
+        print(f"[{self.name}] Cascade models resident: small + large")
+
+        return {tier: model for tier, (_, model) in self.cascade_models.items()}
+
+    def plan_phase_B_workers(self, workers, budget=None):
+        """
+        Thread budget per forked Phase B worker.
+        Workers share the model loaded here (ACT only); they never load one.
+        """
+        if self.state != AgentState.ACT:
+            raise RuntimeError(
+                "Phase B workers planned outside ACT state"
+            )
+
+        if self.model is None:
+            raise RuntimeError("Phase B workers planned before model loading")
+
+        threads = split_thread_budget(workers, budget)
+
+        print(
+            f"[{self.name}] Phase B workers: {workers} × {threads} CPU threads"
+        )
+
+        return threads
+
     def get_model(self):
         """
         Safe accessor for already-loaded model.
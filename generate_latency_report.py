@@ -2,12 +2,20 @@ import pandas as pd
 from pathlib import Path
 import json
 
+from data_pipeline.transcript_store import open_transcript_store
+
 # ============================================================
 # CONFIG (CPU ONLY)
 # ============================================================
 CPU_REALTIME_FACTOR = 0.4  # Whisper large-v1 on CPU (assumed)
 
 # ------------------ PATHS ------------------
+TRANSCRIPT_STORE_DB = (
+    r"D:\new_p_voice_ai_v3\data_pipeline\artifacts"
+    r"\transcript_store\transcripts.sqlite"
+)
+
+# Former per-file CSVs (imported into an empty store)
 INPUT_DIR = Path(r"D:\new_p_voice_ai_v3\data_pipeline\artifacts\transcripts_raw")
 
 LATENCY_DIR = Path(r"D:\new_p_voice_ai_v3\data_pipeline\artifacts\Latency")
@@ -22,18 +30,13 @@ CSV_OUTPUT = CONSOLIDATED_DIR / "audio_latency_consolidated.csv"
 # ============================================================
 # LOAD & REDUCE (one row per audio file)
 # ============================================================
-frames = []
-
-for csv_file in sorted(INPUT_DIR.glob("transcription_*.csv")):
-    df = pd.read_csv(csv_file)
-
-    # Take only the last segment per audio
-    idx = df.groupby("file_name")["segment_id"].idxmax()
-    df_max = df.loc[idx, ["file_name", "end_time_sec"]]
-
-    frames.append(df_max)
+store = open_transcript_store(TRANSCRIPT_STORE_DB, str(INPUT_DIR))
+df = store.read(["file_name", "segment_id", "end_time_sec"])
+store.close()
 
-latency_df = pd.concat(frames, ignore_index=True)
+# Take only the last segment per audio
+idx = df.groupby("file_name")["segment_id"].idxmax()
+latency_df = df.loc[idx, ["file_name", "end_time_sec"]].reset_index(drop=True)
 
 # ============================================================
 # AUDIO NUMBER & DURATION
@@ -0,0 +1,53 @@
+import torch
+from torch import nn
+import whisper.model
+
+
+# None = fp32 weights (default)
+QUANTIZATION_MODES = (None, "int8")
+
+
+def _swap_whisper_linear(module: nn.Module) -> int:
+    """
+    whisper.model.Linear → nn.Linear (same weight / bias tensors).
+    quantize_dynamic matches module types exactly, so the whisper
+    subclass would otherwise stay fp32.
+    """
+    swapped = 0
+
+    for name, child in module.named_children():
+        if type(child) is whisper.model.Linear:
+            linear = nn.Linear(
+                child.in_features,
+                child.out_features,
+                bias=child.bias is not None
+            )
+            linear.weight = child.weight
+            linear.bias = child.bias
+            setattr(module, name, linear)
+            swapped += 1
+        else:
+            swapped += _swap_whisper_linear(child)
+
+    return swapped
+
+
+def quantize_dynamic_int8(model):
+    """
+    Dynamic int8 quantization of every Linear layer (CPU inference).
+    Convolutions, layer norms and embeddings stay fp32.
+    """
+    model = model.cpu().eval()
+
+    swapped = _swap_whisper_linear(model)
+
+    torch.quantization.quantize_dynamic(
+        model,
+        {nn.Linear},
+        dtype=torch.qint8,
+        inplace=True
+    )
+
+    print(f"Dynamic int8 quantization: {swapped} Linear layers")
+
+    return model
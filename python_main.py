@@ -1,10 +1,44 @@
 from execution_controller_agent import ExecutionControllerAgent
-from data_pipeline.run_phase_B import run_phase_B
+from data_pipeline.run_phase_B import (
+    run_phase_B,
+    run_phase_B_cascade,
+    benchmark_workers,
+    benchmark_audio_loading,
+    benchmark_decode_profiles,
+    BATCH_SIZE,
+    WORKERS,
+)
 
 
-def main():
+def main(batch_size=BATCH_SIZE, workers=WORKERS, benchmark=None,
+         quantization=None, compare_quantization=False, cascade=False, vad=False,
+         long_audio=False, with_phase_A=False, feature_cache=False,
+         decode_profile=None, benchmark_profiles=False, watchdog=False):
     print("Starting system")
 
+    if cascade:
+        # Rejected before Phase A / model loading instead of silently dropped
+        unsupported = [
+            flag for flag, enabled in (
+                ("--batch-size", batch_size != BATCH_SIZE),
+                ("--workers", workers != WORKERS),
+                ("--benchmark-workers", bool(benchmark)),
+                ("--vad", vad),
+                ("--long-audio", long_audio),
+                ("--feature-cache", feature_cache),
+                ("--benchmark-decode-profiles", benchmark_profiles),
+            )
+            if enabled
+        ]
+        if unsupported:
+            raise ValueError(f"--cascade does not support {', '.join(unsupported)}")
+
+    # Phase A in-process: samples handed to Phase B without re-decoding
+    handoff_samples = None
+    if with_phase_A:
+        from data_pipeline.run_phase_A import run_phase_A
+        handoff_samples = run_phase_A(return_samples=True)
+
     # Initialize execution controller agent
     agent = ExecutionControllerAgent()
 
@@ -22,22 +56,120 @@ def main():
     # MODEL LOADING (Agent-owned)
     # -----------------------------
 
+    if compare_quantization:
+        # fp32 vs int8, Phase B → E each (agent loads both in ACT)
+        from quantization_comparison import compare_quantization as compare
+        compare(agent, model_name="large-v1")
+        print("System finished cleanly")
+        return
+
+    if cascade:
+        # small → large-v1 escalation, both tiers resident
+        models = agent.load_cascade_models(
+            small_model="small",
+            large_model="large-v1",
+            device="cpu",
+            quantization=quantization
+        )
+        run_phase_B_cascade(
+            models,
+            decode_profile=decode_profile,
+            watchdog=watchdog,
+            handoff_samples=handoff_samples
+        )
+        print("System finished cleanly")
+        return
+
     whisper_model = agent.load_model(
         model_name="large-v1",
-        device="cpu"
+        device="cpu",
+        quantization=quantization
     )
 
     # -----------------------------
     # PIPELINE EXECUTION
     # -----------------------------
 
-    run_phase_B(whisper_model)
+    if benchmark:
+        # Throughput vs worker count, nothing persisted
+        benchmark_workers(whisper_model, agent, benchmark, batch_size=batch_size)
+    elif benchmark_profiles:
+        # Per-file wall time of accurate / balanced / fast
+        benchmark_decode_profiles(whisper_model)
+    else:
+        cache = None
+        if feature_cache:
+            # Log-mel / encoder outputs reused across reruns of this model
+            from data_pipeline.feature_cache import FeatureCache
+            cache = FeatureCache("large-v1", quantization)
+
+        threads_per_worker = (
+            agent.plan_phase_B_workers(workers) if workers > 1 else 1
+        )
+        run_phase_B(
+            whisper_model,
+            batch_size=batch_size,
+            workers=workers,
+            threads_per_worker=threads_per_worker,
+            vad=vad,
+            long_audio=long_audio,
+            handoff_samples=handoff_samples,
+            feature_cache=cache,
+            decode_profile=decode_profile,
+            watchdog=watchdog
+        )
 
     print("System finished cleanly")
 
 
 if __name__ == "__main__":
-    main()
+    # python python_main.py --batch-size=8
+    # python python_main.py --workers=3
+    # python python_main.py --benchmark-workers=1,2,3,6
+    # python python_main.py --quantization=int8
+    # python python_main.py --compare-quantization
+    # python python_main.py --cascade
+    # python python_main.py --vad
+    # python python_main.py --long-audio
+    # python python_main.py --with-phase-A
+    # python python_main.py --audio-handoff-benchmark
+    # python python_main.py --feature-cache
+    # python python_main.py --decode-profile=fast
+    # python python_main.py --benchmark-decode-profiles
+    # python python_main.py --watchdog
+    import sys
+
+    if "--audio-handoff-benchmark" in sys.argv:
+        # No model needed: ffmpeg vs in-process decode per file
+        benchmark_audio_loading()
+        sys.exit(0)
+
+    def arg_value(prefix, default):
+        return next(
+            (arg.split("=", 1)[1] for arg in sys.argv if arg.startswith(prefix)),
+            default
+        )
+
+    batch_size = int(arg_value("--batch-size=", BATCH_SIZE))
+    workers = int(arg_value("--workers=", WORKERS))
+    benchmark = arg_value("--benchmark-workers=", None)
+    quantization = arg_value("--quantization=", None)
+
+    main(
+        batch_size=batch_size,
+        workers=workers,
+        benchmark=[int(n) for n in benchmark.split(",")] if benchmark else None,
+        quantization=quantization,
+        compare_quantization="--compare-quantization" in sys.argv,
+        cascade="--cascade" in sys.argv,
+        vad="--vad" in sys.argv,
+        long_audio="--long-audio" in sys.argv,
+        with_phase_A="--with-phase-A" in sys.argv,
+        feature_cache="--feature-cache" in sys.argv,
+        decode_profile=arg_value("--decode-profile=", None),
+        benchmark_profiles="--benchmark-decode-profiles" in sys.argv,
+        watchdog="--watchdog" in sys.argv
+    )
 
 # new_p_voice_ai_v3.python_main
 
@@ -0,0 +1,138 @@
+import os
+import json
+
+from data_pipeline.run_phase_B import run_phase_B
+from data_pipeline.phase_C_structured_boundary_extraction.run_phase_C import run_phase_C
+from data_pipeline.phase_D_fuzzy_canonical_mapping.run_phase_D import run_phase_D
+from data_pipeline.phase_E_evaluation_audit.run_phase_E import run_phase_E
+
+
+COMPARE_DIR = (
+    r"D:\new_p_voice_ai_v3\data_pipeline\artifacts\quantization_comparison"
+)
+
+# int8 is accepted only if it loses at most this many exact name
+# matches (Phase E tp) and its quantity MAE grows by at most this much
+NAME_MATCH_TOLERANCE = 0
+QUANTITY_MAE_TOLERANCE = 0.0
+
+
+def _run_precision(agent, model_name, quantization):
+    """
+    Phase B → E for one precision into COMPARE_DIR/<precision>.
+    The production store and artifacts are not touched.
+    """
+    label = quantization or "fp32"
+    out_dir = os.path.join(COMPARE_DIR, label)
+    os.makedirs(out_dir, exist_ok=True)
+
+    print(f"\n=== Quantization comparison: {label} ===")
+
+    model = agent.load_model(model_name, device="cpu", quantization=quantization)
+
+    # Fresh transcripts for this precision
+    store_db = os.path.join(out_dir, "transcripts.sqlite")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(store_db + suffix):
+            os.remove(store_db + suffix)
+
+    files, audio_seconds, seconds = run_phase_B(
+        model, store_db=store_db, legacy_csv_dir=""
+    )
+
+    phase_c_csv = run_phase_C(
+        store_db=store_db,
+        output_dir=os.path.join(out_dir, "phase_C"),
+        legacy_csv_dir=""
+    )
+    phase_d_csv = run_phase_D(
+        phase_c_csv=phase_c_csv,
+        output_dir=os.path.join(out_dir, "phase_D"),
+        incremental=False,
+        # Both precisions scored from scratch, production cache untouched
+        use_match_cache=False
+    )
+
+    report = {
+        "precision": label,
+        "phase_B_files": files,
+        "phase_B_audio_sec": round(audio_seconds, 2),
+        "phase_B_sec": round(seconds, 2),
+        "phase_B_realtime": round(audio_seconds / seconds, 2) if seconds else None,
+        "metrics": None,
+        "error": None,
+    }
+
+    try:
+        report["metrics"] = run_phase_E(
+            pred_csv=phase_d_csv,
+            out_dir=os.path.join(out_dir, "phase_E")
+        )
+    except ValueError as e:
+        # e.g. a different item count no longer aligns with the ground truth
+        report["error"] = str(e)
+
+    return report
+
+
+def _decide(fp32, int8):
+    if int8["error"] is not None:
+        return False, [f"int8 Phase E failed: {int8['error']}"]
+
+    if fp32["error"] is not None:
+        return False, [f"fp32 Phase E failed: {fp32['error']}"]
+
+    reasons = []
+    fp32_m, int8_m = fp32["metrics"], int8["metrics"]
+
+    if int8_m["tp"] < fp32_m["tp"] - NAME_MATCH_TOLERANCE:
+        reasons.append(
+            f"name matches {fp32_m['tp']} → {int8_m['tp']} "
+            f"(accuracy {fp32_m['accuracy']} → {int8_m['accuracy']})"
+        )
+
+    if int8_m["quantity_mae"] > fp32_m["quantity_mae"] + QUANTITY_MAE_TOLERANCE:
+        reasons.append(
+            f"quantity MAE {fp32_m['quantity_mae']} → {int8_m['quantity_mae']}"
+        )
+
+    return not reasons, reasons
+
+
+def compare_quantization(agent, model_name="large-v1"):
+    """
+    fp32 vs dynamic int8: both run Phase B → E; int8 is accepted only
+    when name accuracy and quantity MAE hold. Agent must be in ACT.
+    """
+    fp32 = _run_precision(agent, model_name, None)
+    int8 = _run_precision(agent, model_name, "int8")
+
+    accepted, reasons = _decide(fp32, int8)
+
+    report = {
+        "model": model_name,
+        "fp32": fp32,
+        "int8": int8,
+        "speedup": (
+            round(fp32["phase_B_sec"] / int8["phase_B_sec"], 2)
+            if int8["phase_B_sec"] else None
+        ),
+        "name_match_tolerance": NAME_MATCH_TOLERANCE,
+        "quantity_mae_tolerance": QUANTITY_MAE_TOLERANCE,
+        "int8_accepted": accepted,
+        "rejection_reasons": reasons,
+    }
+
+    report_path = os.path.join(COMPARE_DIR, "quantization_comparison.json")
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(
+        f"\nint8 vs fp32: Phase B speedup {report['speedup']}x → "
+        f"{'ACCEPTED' if accepted else 'REJECTED'}"
+    )
+    for reason in reasons:
+        print(f"  {reason}")
+    print(f"Report written → {report_path}")
+
+    return report
@@ -21,3 +21,14 @@ def configure_runtime(agent_name: str, agent_state):
         f"[{agent_name}] Runtime configured → "
         f"CPU threads = {threads} (state={agent_state.name})"
     )
+
+
+def split_thread_budget(workers: int, budget: int = None) -> int:
+    """
+    Torch threads per Phase B worker process.
+    budget defaults to all logical CPUs; every worker gets >= 1.
+    """
+    if budget is None:
+        budget = os.cpu_count() or 1
+
+    return max(1, budget // max(1, workers))